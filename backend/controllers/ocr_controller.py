@@ -1,10 +1,21 @@
 """
 Controlador principal - CORRIGIENDO importaciones.
 """
+import asyncio
+import atexit
+import hashlib
 import logging
+import multiprocessing
+import os
+import queue
+import subprocess
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Any, List
+from threading import BoundedSemaphore, Thread
+from typing import Dict, Any, List, Optional, Tuple
 
 from models.validator import DocumentValidator
 from models.pdf_processor import AdvancedPDFProcessor
@@ -13,12 +24,170 @@ from models.document import Document
 # CORREGIR: Usar la instancia global, no la clase
 from models.pdf_processor import pdf_processor  # ← Cambiar esto
 from models.result_manager import ResultManager
+from utils.cache import ttl_cache
 
 logger = logging.getLogger(__name__)
 
+# Evitar sobre-suscripción de hilos OpenMP de Tesseract al paralelizar por procesos
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+# Procesador del worker (lo fija _init_worker en cada proceso del pool)
+_worker_processor = None
+
+
+def _init_worker():
+    """Initializer del pool: carga una sola vez el procesador por proceso worker."""
+    global _worker_processor
+    from models.pdf_processor import pdf_processor as processor
+    _worker_processor = processor
+
+
+def _process_pdf_worker(pdf_path_str: str) -> Tuple[Optional[Document], Dict[str, Any]]:
+    """
+    Valida y procesa un PDF sin persistir resultados.
+    
+    Se define a nivel de módulo para poder ejecutarse en un ProcessPoolExecutor;
+    el guardado se hace siempre en el proceso principal.
+    
+    Returns:
+        Tupla (documento o None si falló, resumen del procesamiento)
+    """
+    pdf_path = Path(pdf_path_str)
+    
+    # Validar archivo
+    is_valid, errors = DocumentValidator.validate_pdf_basic(pdf_path)
+    if not is_valid:
+        return None, {"success": False, "error": f"Archivo inválido: {', '.join(errors)}"}
+    
+    start_ns = time.perf_counter_ns()
+    
+    # USAR pdf_processor global (o el del worker) en lugar de crear instancia
+    processor = _worker_processor or pdf_processor
+    result = processor.process_pdf(pdf_path)
+    
+    processing_ns = time.perf_counter_ns() - start_ns
+    method = result.get("method", "integrated")
+    
+    if not result.get("success"):
+        # Sin Document en el camino de error: no se persiste nada
+        error = result.get("error", "Error desconocido")
+        logger.error("Documento %s falló: %s", pdf_path.name, error)
+        return None, {"success": False, "error": result.get("error")}
+    
+    # Crear documento
+    document = Document(pdf_path.name)
+    document.set_file_info(pdf_path)
+    document.add_content(
+        result["texto_procesado"], 
+        result["paginas"],
+        result.get("tablas", [])
+    )
+    document.mark_as_processed(processing_ns, method)
+    
+    return document, {
+        "success": True,
+        "error": None,
+        "processing_time": processing_ns / 1e9,
+        "method": method
+    }
+
+
+@ttl_cache(ttl=60)
+def _probe_tesseract() -> Dict[str, Any]:
+    """Verificar Tesseract (versión e idiomas); cacheado para no lanzar subprocesos en cada consulta."""
+    try:
+        # Camino rápido: API en proceso, sin fork/exec
+        import tesserocr
+    except ImportError:
+        return _probe_tesseract_subprocess()
+    
+    try:
+        version_line = tesserocr.tesseract_version().split('\n')[0]
+        version = version_line.split()[-1] if version_line else "unknown"
+        _, languages = tesserocr.get_languages()
+        return {
+            "available": True,
+            "version": version,
+            "languages": list(languages)
+        }
+    except Exception as e:
+        logger.warning("tesserocr no disponible, usando subprocess: %s", e)
+        return _probe_tesseract_subprocess()
+
+
+# Caché persistente de `tesseract --list-langs` (sobrevive reinicios)
+_LANGS_CACHE_FILE = Path.home() / ".cache" / "ocr-mvc" / "tesseract_langs.txt"
+
+
+def _load_cached_languages(version_key: str) -> Optional[List[str]]:
+    """Lee idiomas cacheados si corresponden a la misma instalación de Tesseract."""
+    try:
+        lines = _LANGS_CACHE_FILE.read_text(encoding='utf-8').splitlines()
+    except OSError:
+        return None
+    if not lines or lines[0] != version_key:
+        return None
+    return lines[1:]
+
+
+def _store_cached_languages(version_key: str, languages: List[str]):
+    """Guarda idiomas de forma atómica (escritura a temporal + rename)."""
+    try:
+        _LANGS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = _LANGS_CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text("\n".join([version_key, *languages]), encoding='utf-8')
+        os.replace(tmp_file, _LANGS_CACHE_FILE)
+    except OSError as e:
+        logger.debug("No se pudo cachear idiomas de Tesseract: %s", e)
+
+
+def _probe_tesseract_subprocess() -> Dict[str, Any]:
+    """
+    Verificar Tesseract invocando el binario (fallback sin tesserocr).
+    
+    La lista de idiomas se cachea en disco, indexada por el hash de
+    `tesseract --version`, así una reinstalación invalida el caché.
+    """
+    try:
+        version_output = subprocess.check_output(
+            ['tesseract', '--version'], stderr=subprocess.STDOUT, text=True, timeout=10
+        )
+    except subprocess.CalledProcessError:
+        return {"available": False, "errors": ["Tesseract no ejecutable"]}
+    except Exception as e:
+        logger.error("Error verificando Tesseract: %s", e)
+        return {"available": False, "errors": [str(e)]}
+    
+    version_lines = version_output.splitlines()
+    version = version_lines[0].split()[-1] if version_lines and version_lines[0].strip() else "unknown"
+    version_key = hashlib.sha1(version_output.encode('utf-8')).hexdigest()
+    
+    languages = _load_cached_languages(version_key)
+    if languages is None:
+        try:
+            lang_output = subprocess.check_output(
+                ['tesseract', '--list-langs'], stderr=subprocess.DEVNULL, text=True, timeout=10
+            )
+            languages = lang_output.splitlines()[1:]
+            _store_cached_languages(version_key, languages)
+        except Exception as e:
+            logger.warning("No se pudo listar idiomas de Tesseract: %s", e)
+            languages = []
+    
+    return {
+        "available": True,
+        "version": version,
+        "languages": languages
+    }
+
+
 class OCRController:
     """Controlador principal SIN duplicaciones."""
     
+    # Máximo de PDFs procesados en paralelo (Tesseract es intensivo en CPU)
+    MAX_WORKERS = 3
+    
     def __init__(self):
         """Inicializar controlador usando DocumentValidator."""
         paths = DocumentValidator.get_system_paths()
@@ -32,16 +201,37 @@ class OCRController:
         # Inicializar gestor de resultados
         self.result_manager = ResultManager(self.results_dir)
         
+        # Pool de procesos para lotes (se crea al primer uso)
+        self._pool = None
+        
+        # Workers persistentes para process_pdf_async (se crean al primer uso)
+        self._executor = None
+        
+        # Escritor único en segundo plano: el guardado no bloquea el OCR y,
+        # al ser un solo hilo, la numeración de carpetas no tiene carreras
+        self._save_q = queue.Queue(maxsize=64)
+        self._saver = Thread(target=self._saver_loop, name="result-saver", daemon=True)
+        self._saver.start()
+        
+        # Los resultados encolados se guardan aunque el llamador no use shutdown()
+        atexit.register(self.shutdown)
+        
         logger.info("OCRController inicializado usando DocumentValidator")
     
-    def get_system_status(self) -> Dict[str, Any]:
-        """Verificar estado usando DocumentValidator."""
+    def get_system_status(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Verificar estado usando DocumentValidator.
+        
+        Los sondeos de dependencias y de Tesseract se cachean unos segundos;
+        usar refresh=True para forzar una nueva verificación. "dependencies"
+        indica si cada módulo es importable (find_spec), no que se haya cargado.
+        """
         try:
             dependencies = DocumentValidator.check_dependencies([
                 'pytesseract', 'cv2', 'PIL', 'pdfplumber', 'fitz', 'pandas', 'numpy'
-            ])
+            ], refresh=refresh)
             
-            tesseract_available = self._check_tesseract_with_utils()
+            tesseract_available = self._check_tesseract_with_utils(refresh=refresh)
             
             return {
                 "tesseract_available": tesseract_available["available"],
@@ -53,107 +243,198 @@ class OCRController:
             }
             
         except Exception as e:
-            logger.error(f"Error verificando sistema: {e}")
+            logger.error("Error verificando sistema: %s", e)
             return {"error": str(e)}
     
-    def get_available_pdfs(self) -> List[Path]:
-        """Lista PDFs usando DocumentValidator."""
+    def get_available_pdfs(self, quick_validate: bool = False) -> List[Path]:
+        """
+        Lista PDFs del directorio de entrada.
+        
+        La validación completa se hace al procesar; con quick_validate=True
+        se descartan además los archivos sin cabecera '%PDF-'.
+        """
         try:
             if not self.pdfs_dir.exists():
                 return []
             
-            pdf_files = []
-            for pdf_path in self.pdfs_dir.glob("*.pdf"):
-                is_valid, _ = DocumentValidator.validate_pdf_basic(pdf_path)
-                if is_valid:
-                    pdf_files.append(pdf_path)
+            # Mismo criterio que glob("*.pdf"): sigue enlaces simbólicos, distingue
+            # mayúsculas y omite los archivos ocultos
+            with os.scandir(self.pdfs_dir) as it:
+                entries = [
+                    e for e in it
+                    if e.name.endswith('.pdf') and not e.name.startswith('.') and e.is_file()
+                ]
+            
+            if quick_validate:
+                entries = [e for e in entries if self._has_pdf_header(e.path)]
             
-            return sorted(pdf_files, key=lambda x: x.name.lower())
+            # Clave calculada una vez por entrada (casefold: orden correcto con Unicode)
+            keyed = [(e.name.casefold(), e.path) for e in entries]
+            keyed.sort(key=itemgetter(0))
+            return [Path(path) for _, path in keyed]
             
         except Exception as e:
-            logger.error(f"Error listando PDFs: {e}")
+            logger.error("Error listando PDFs: %s", e)
             return []
     
+    @staticmethod
+    def _has_pdf_header(path: str) -> bool:
+        """Comprueba solo los bytes mágicos del PDF."""
+        try:
+            with open(path, 'rb') as f:
+                return f.read(5) == b'%PDF-'
+        except OSError:
+            return False
+    
     def process_pdf(self, pdf_path: Path) -> Dict[str, Any]:
         """Procesar PDF usando pdf_processor global."""
         try:
-            # Validar archivo
-            is_valid, errors = DocumentValidator.validate_pdf_basic(pdf_path)
-            if not is_valid:
-                return {"success": False, "error": f"Archivo inválido: {', '.join(errors)}"}
-            
-            # Crear documento
-            document = Document(pdf_path.name)
-            document.set_file_info(pdf_path)
-            
-            start_time = time.time()
-            
-            # USAR pdf_processor global en lugar de crear instancia
-            result = pdf_processor.process_pdf(pdf_path)
-            
-            processing_time = time.time() - start_time
-            
-            if result.get("success"):
-                document.add_content(
-                    result["texto_procesado"], 
-                    result["paginas"],
-                    result.get("tablas", [])
-                )
-                
-                document.mark_as_processed(processing_time, result.get("method", "integrated"))
-                
-                # Guardar resultados
-                saved, folder_name = self.result_manager.save_document(document)
-                
-                return {
-                    "success": True,
-                    "paginas": document.pages,
-                    "tablas": document.tables,
-                    "processing_time": processing_time,
-                    "results_saved": saved,
-                    "output_folder": folder_name,
-                    "method": result.get("method", "integrated")
-                }
-            else:
-                document.mark_as_failed(result.get("error", "Error desconocido"))
-                return {"success": False, "error": result.get("error")}
+            document, outcome = _process_pdf_worker(str(pdf_path))
+            return self._finalize_result(document, outcome)
                 
         except Exception as e:
-            logger.error(f"Error procesando PDF: {e}", exc_info=True)
+            logger.error("Error procesando PDF: %s", e, exc_info=e)
             return {"success": False, "error": str(e)}
     
-    def _check_tesseract_with_utils(self) -> Dict[str, Any]:
-        """Verificar Tesseract."""
-        try:
-            import subprocess
-            result = subprocess.run(['tesseract', '--version'], 
-                                  capture_output=True, text=True, timeout=10)
+    async def process_pdf_async(self, pdf_path: Path) -> Dict[str, Any]:
+        """
+        Versión no bloqueante de process_pdf para contextos asyncio (web/UI).
+        
+        El trabajo corre en un pool de hilos persistente; cada hilo usa su
+        propia API tesserocr (sin lock global), por lo que el OCR va en paralelo.
+        pdf_processor es compartido entre hilos: no debe guardar estado por PDF.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.process_pdf, pdf_path)
+    
+    def process_pdfs(self, pdf_paths: List[Path]) -> Dict[Path, Dict[str, Any]]:
+        """
+        Procesa varios PDFs en paralelo con concurrencia acotada.
+        
+        El OCR corre en procesos worker; el guardado de resultados se hace en
+        este proceso para no compartir estado del ResultManager.
+        
+        Args:
+            pdf_paths: Lista de rutas a PDFs
             
-            if result.returncode == 0:
-                version_line = result.stdout.split('\n')[0]
-                version = version_line.split()[-1] if version_line else "unknown"
-                
-                lang_result = subprocess.run(['tesseract', '--list-langs'], 
-                                           capture_output=True, text=True, timeout=10)
-                
-                languages = []
-                if lang_result.returncode == 0:
-                    languages = lang_result.stdout.strip().split('\n')[1:]
-                
-                return {
-                    "available": True,
-                    "version": version,
-                    "languages": languages
-                }
-            else:
-                return {"available": False, "errors": ["Tesseract no ejecutable"]}
-                
-        except Exception as e:
-            logger.error(f"Error verificando Tesseract: {e}")
-            return {"available": False, "errors": [str(e)]}
+        Returns:
+            Diccionario {ruta: resultado} con el mismo formato que process_pdf
+        """
+        results = {}
+        if not pdf_paths:
+            return results
+        
+        pool = self._get_pool()
+        # Limitar trabajos en vuelo para no encolar todo el lote en memoria
+        in_flight = BoundedSemaphore(self._max_workers() * 2)
+        futures = {}
+        
+        for pdf_path in pdf_paths:
+            in_flight.acquire()
+            future = pool.submit(_process_pdf_worker, str(pdf_path))
+            future.add_done_callback(lambda _: in_flight.release())
+            futures[future] = pdf_path
+        
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            try:
+                document, outcome = future.result()
+                results[pdf_path] = self._finalize_result(document, outcome)
+            except Exception as e:
+                logger.error("Error procesando %s en lote: %s", pdf_path.name, e)
+                results[pdf_path] = {"success": False, "error": str(e)}
+        
+        return results
+    
+    def flush(self):
+        """Espera a que se guarden todos los resultados encolados."""
+        self._save_q.join()
+    
+    def shutdown(self):
+        """Guarda resultados pendientes y libera los pools de procesos/hilos."""
+        atexit.unregister(self.shutdown)
+        self.flush()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        # Pool de páginas, APIs tesserocr y caché OCR del procesador compartido
+        pdf_processor.close()
+        self.result_manager.close()
+    
+    def _max_workers(self) -> int:
+        return min(os.cpu_count() or 1, self.MAX_WORKERS)
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Crea el pool de procesos de forma perezosa.
+        
+        En Linux usa 'forkserver' con los módulos pesados precargados: los
+        workers nacen de un proceso que ya los importó y comparten sus páginas
+        (copy-on-write) en lugar de cargarlos cada uno.
+        """
+        if self._pool is None:
+            mp_context = None
+            if sys.platform.startswith('linux'):
+                mp_context = multiprocessing.get_context('forkserver')
+                mp_context.set_forkserver_preload(['models.pdf_processor'])
+            
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._max_workers(),
+                mp_context=mp_context,
+                initializer=_init_worker
+            )
+        return self._pool
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Crea el pool de hilos de forma perezosa."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.MAX_WORKERS, thread_name_prefix="ocr-worker"
+            )
+        return self._executor
+    
+    def _finalize_result(self, document: Optional[Document], outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """Guarda el documento (si tuvo éxito) y arma la respuesta para la vista."""
+        if document is None or not outcome.get("success"):
+            return {"success": False, "error": outcome.get("error")}
+        
+        # La carpeta se reserva ahora; los archivos se guardan en segundo plano (ver flush)
+        folder_name = self.result_manager.reserve_folder_name(document.filename)
+        self._save_q.put((document, folder_name))
+        
+        return {
+            "success": True,
+            "paginas": document.pages,
+            "tablas": document.tables,
+            "processing_time": outcome["processing_time"],
+            "save_queued": True,
+            "output_folder": folder_name,
+            "method": outcome["method"]
+        }
+    
+    def _saver_loop(self):
+        """Consume la cola de documentos y los persiste con ResultManager."""
+        while True:
+            document, folder_name = self._save_q.get()
+            try:
+                saved, folder_name = self.result_manager.save_document(document, folder_name)
+                if not saved:
+                    logger.error("No se pudo guardar %s: %s", document.filename, folder_name)
+            except Exception as e:
+                logger.error("Error guardando %s: %s", document.filename, e)
+            finally:
+                self._save_q.task_done()
+    
+    def _check_tesseract_with_utils(self, refresh: bool = False) -> Dict[str, Any]:
+        """Verificar Tesseract (resultado cacheado, ver _probe_tesseract)."""
+        return _probe_tesseract(refresh=refresh)
     
     # Getters simples
     def get_results_summary(self) -> Dict[str, Any]:
+        self.flush()
         return self.result_manager.get_summary()
     
     def get_pdfs_dir(self) -> Path:
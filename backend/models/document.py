@@ -2,13 +2,72 @@
 Modelo de documento - VERSIÓN CENTRALIZADA sin duplicaciones.
 """
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import logging
 from dataclasses import dataclass
+from operator import attrgetter
+
+from utils.fast_json import dumps_bytes
 
 logger = logging.getLogger(__name__)
 
+# Layout de metadatos de to_dict: (clave de salida, atributo del Document)
+_META_LAYOUT = (
+    ("filename", "filename"),
+    ("pages", "pages"),
+    ("processing_time", "processing_time"),
+    ("file_size_mb", "file_size_mb"),
+    ("file_size_bytes", "file_size_bytes"),
+    ("method", "method"),
+    ("created_at", "created_at_iso"),
+    ("success", "success"),
+    ("tables_count", "tables_count"),
+    ("word_count", "word_count"),
+    ("character_count", "character_count"),
+)
+_META_KEYS = tuple(key for key, _ in _META_LAYOUT)
+_META_GETTER = attrgetter(*(attr for _, attr in _META_LAYOUT))
+
+# Tablas vacías compartidas (inmutable: evita una lista nueva por documento)
+_EMPTY_TABLES: tuple = ()
+
+# Tamaño de bloque para contar palabras sin materializar la lista completa
+_WORD_COUNT_CHUNK = 1 << 16
+
+
+def _count_words(text: str) -> int:
+    """
+    Cuenta palabras (secuencias sin espacios) recorriendo el texto por bloques.
+    
+    Equivale a len(text.split()) pero la memoria extra queda acotada al bloque,
+    lo que importa con textos OCR de varios MB.
+    """
+    count = 0
+    for start in range(0, len(text), _WORD_COUNT_CHUNK):
+        chunk = text[start:start + _WORD_COUNT_CHUNK]
+        count += len(chunk.split())
+        # Una palabra partida entre dos bloques se contó dos veces
+        if start and not chunk[0].isspace() and not text[start - 1].isspace():
+            count -= 1
+    return count
+
+
+def _fused_stats(text: str) -> Tuple[str, int, int]:
+    """
+    Normaliza el texto y calcula sus estadísticas en un único recorrido.
+    
+    strip() solo inspecciona los extremos (y no copia si no hay nada que
+    quitar) y len() es O(1): el único barrido completo es el conteo de palabras.
+    
+    Returns:
+        Tupla (texto_sin_espacios_extremos, palabras, caracteres)
+    """
+    if not text:
+        return "", 0, 0
+    content = text.strip()
+    return content, _count_words(content), len(content)
+
 @dataclass
 class ProcessingResult:
     """Resultado de procesamiento de página."""
@@ -22,110 +81,131 @@ class ProcessingResult:
 class Document:
     """Representa un documento procesado por OCR - FUNCIONALIDAD CENTRALIZADA."""
     
+    __slots__ = (
+        'filename', 'content', 'pages', 'processing_ns',
+        'file_size_bytes', 'created_at', 'success', 'method', 'tables',
+        'word_count', 'character_count', 'error', '_created_iso', '_utf8_cache'
+    )
+    
     def __init__(self, filename: str):
         self.filename = filename
         self.content = ""
         self.pages = 0
-        self.processing_time = 0.0
-        self.file_size_mb = 0.0
+        self.processing_ns = 0
         self.file_size_bytes = 0
         self.created_at = datetime.now()
         self.success = False
         self.method = "integrated"
-        self.tables = []
+        self.tables = _EMPTY_TABLES
         self.word_count = 0
         self.character_count = 0
         self.error = None
+        self._created_iso = self.created_at.isoformat()
+        self._utf8_cache = None
+    
+    @property
+    def created_at_iso(self) -> str:
+        """Fecha de creación en ISO 8601 (calculada en __init__)."""
+        return self._created_iso
+    
+    @property
+    def processing_time(self) -> float:
+        """Tiempo de procesamiento en segundos (se guarda en ns)."""
+        return self.processing_ns / 1e9
+    
+    @property
+    def file_size_mb(self) -> float:
+        """Tamaño del archivo en MB (derivado de file_size_bytes)."""
+        return self.file_size_bytes / (1 << 20)
+    
+    @property
+    def file_size_kb(self) -> float:
+        """Tamaño del archivo en KB (derivado de file_size_bytes)."""
+        return self.file_size_bytes / (1 << 10)
+    
+    @property
+    def tables_count(self) -> int:
+        return len(self.tables)
+    
+    @property
+    def content_utf8(self) -> bytes:
+        """Contenido codificado en UTF-8 (se codifica una sola vez por contenido)."""
+        if self._utf8_cache is None:
+            self._utf8_cache = self.content.encode('utf-8')
+        return self._utf8_cache
+    
+    @property
+    def utf8_bytes(self) -> int:
+        """Tamaño en bytes del contenido codificado en UTF-8."""
+        return len(self.content_utf8)
     
     def set_file_info(self, file_path: Path):
         """Establece información completa del archivo - EXPANDIDO."""
         try:
             if file_path.exists():
-                stat_info = file_path.stat()
-                self.file_size_bytes = stat_info.st_size
-                self.file_size_mb = stat_info.st_size / (1024 * 1024)
-                logger.debug(f"Archivo {file_path.name}: {self.file_size_mb:.2f} MB")
+                self.file_size_bytes = file_path.stat().st_size
+                logger.debug("Archivo %s: %.2f MB", file_path.name, self.file_size_mb)
             else:
-                logger.warning(f"Archivo no existe: {file_path}")
+                logger.warning("Archivo no existe: %s", file_path)
         except Exception as e:
-            logger.error(f"Error obteniendo info de archivo {file_path}: {e}")
+            logger.error("Error obteniendo info de archivo %s: %s", file_path, e)
     
     def add_content(self, text: str, page_count: int, tables: List[Dict] = None):
         """Añade contenido con estadísticas completas - MEJORADO."""
-        self.content = text.strip()
+        self.content, self.word_count, self.character_count = _fused_stats(text)
+        self._utf8_cache = None
         self.pages = page_count
-        self.tables = tables or []
-        
-        # Calcular estadísticas automáticamente
-        self._calculate_content_stats()
-    
-    def _calculate_content_stats(self):
-        """Calcula estadísticas del contenido - NUEVO."""
-        if self.content:
-            self.word_count = len(self.content.split())
-            self.character_count = len(self.content)
-        else:
-            self.word_count = 0
-            self.character_count = 0
+        self.tables = tables if tables else _EMPTY_TABLES
     
-    def mark_as_processed(self, processing_time: float, method: str = "integrated"):
-        """Marca como procesado exitosamente."""
-        self.processing_time = processing_time
+    def mark_as_processed(self, processing_ns: int, method: str = "integrated"):
+        """Marca como procesado exitosamente (duración en ns de time.perf_counter_ns)."""
+        self.processing_ns = processing_ns
         self.method = method
         self.success = True
         self.error = None
-        logger.info(f"Documento {self.filename} procesado en {processing_time:.2f}s")
+        logger.info("Documento %s procesado en %.2fs", self.filename, self.processing_time)
     
-    def mark_as_failed(self, error: str):
-        """Marca como fallido."""
+    def mark_as_failed(self, error: str, context: Optional[str] = None):
+        """Marca como fallido (context identifica la etapa en el log)."""
         self.success = False
         self.error = error
-        logger.error(f"Documento {self.filename} falló: {error}")
+        if context:
+            logger.error("Documento %s falló (%s): %s", self.filename, context, error)
+        else:
+            logger.error("Documento %s falló: %s", self.filename, error)
     
     def get_tables_count(self) -> int:
         """Obtiene número de tablas detectadas - MÉTODO PRINCIPAL."""
         return len(self.tables)
     
     def _safe_timestamp(self, timestamp: Optional[datetime] = None) -> str:
-        """Conversión segura de timestamps - CENTRALIZADO."""
-        try:
-            ts = timestamp or self.created_at
-            if hasattr(ts, 'isoformat'):
-                return ts.isoformat()
-            elif ts:
-                return str(ts)
-            else:
-                return datetime.now().isoformat()
-        except Exception:
-            return datetime.now().isoformat()
+        """Conversión de timestamps - CENTRALIZADO (created_at ya viene precalculado)."""
+        if timestamp is None:
+            return self._created_iso
+        return timestamp.isoformat()
     
     def to_dict(self, include_content: bool = True) -> Dict[str, Any]:
         """Convierte a diccionario - MÉTODO PRINCIPAL centralizado."""
-        base_dict = {
-            "filename": self.filename,
-            "pages": self.pages,
-            "processing_time": self.processing_time,
-            "file_size_mb": self.file_size_mb,
-            "file_size_bytes": self.file_size_bytes,
-            "method": self.method,
-            "created_at": self._safe_timestamp(),
-            "success": self.success,
-            "tables_count": self.get_tables_count(),
-            "word_count": self.word_count,
-            "character_count": self.character_count
-        }
+        base_dict = dict(zip(_META_KEYS, _META_GETTER(self)))
         
         if include_content:
-            base_dict.update({
-                "content": self.content,
-                "tables": self.tables
-            })
+            base_dict["content"] = self.content
+            base_dict["tables"] = self.tables
         
         if self.error:
             base_dict["error"] = self.error
             
         return base_dict
     
+    def to_json_bytes(self, include_content: bool = False) -> bytes:
+        """
+        Serializa a JSON (bytes UTF-8) con orjson si está disponible.
+        
+        Por defecto omite el contenido: el texto completo se guarda aparte
+        en el .txt y así no se escapa el campo más grande.
+        """
+        return dumps_bytes(self.to_dict(include_content=include_content))
+    
     def get_metadata_only(self) -> Dict[str, Any]:
         """Obtiene solo metadatos sin contenido - NUEVO."""
         return self.to_dict(include_content=False)
@@ -136,7 +216,7 @@ class Document:
             "filename": self.filename,
             "size_bytes": self.file_size_bytes,
             "size_mb": self.file_size_mb,
-            "size_kb": self.file_size_bytes / 1024 if self.file_size_bytes > 0 else 0,
+            "size_kb": self.file_size_kb,
             "exists": self.file_size_bytes > 0,
             "created_at": self._safe_timestamp()
         }
@@ -171,22 +251,13 @@ class Document:
             "summary_text": self.get_summary()
         }
     
-    @staticmethod
-    def create_error_result(filename: str, error: str, context: str = "general") -> 'Document':
+    @classmethod
+    def create_error_result(cls, filename: str, error: str, context: str = "general") -> 'Document':
         """Crear Document de error - REEMPLAZA ErrorHandlers.create_error_result."""
-        logger.error(f"Error {context}: {error}")
-        
-        # Crear Document con error
-        doc = Document(
-            filename=filename,
-            content="",
-            success=False,
-            error=error
-        )
-        doc.processing_method = "error"
-        doc.page_count = 0
-        doc.tables = []
-        
+        doc = cls(filename)
+        doc.method = "error"
+        # Un solo registro del fallo (mark_as_failed ya lo escribe)
+        doc.mark_as_failed(error, context)
         return doc
 
 # Factory function para compatibilidad
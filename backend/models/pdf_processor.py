@@ -1,92 +1,7 @@
-"""
-Gestor para el diccionario dinámico.
-"""
-import logging
-import json
-from pathlib import Path
-from typing import Dict, List
-from datetime import datetime
-from utils.dynamic_dictionary import dynamic_dictionary
-
-logger = logging.getLogger(__name__)
-
-class DynamicDictionaryManager:
-    """Gestiona el diccionario dinámico."""
-    
-    def __init__(self):
-        self.dictionary = dynamic_dictionary
-    
-    def seed_from_external_source(self, source_path: Path) -> int:
-        """Inicializar diccionario desde fuente externa (solo la primera vez)."""
-        try:
-            if source_path.suffix.lower() == '.json':
-                with open(source_path, 'r', encoding='utf-8') as f:
-                    external_data = json.load(f)
-                
-                if isinstance(external_data, dict):
-                    # Añadir como correcciones iniciales
-                    for error, correction in external_data.items():
-                        self.dictionary.add_manual_correction(error, correction, confidence=0.8)
-                    
-                    logger.info(f"Diccionario inicializado con {len(external_data)} correcciones")
-                    return len(external_data)
-            
-            elif source_path.suffix.lower() == '.txt':
-                # Texto de ejemplo para aprender vocabulario válido
-                with open(source_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-                
-                stats = self.dictionary.learn_from_text(text, f"seed_{source_path.name}")
-                logger.info(f"Diccionario inicializado aprendiendo de texto: {stats}")
-                return stats['new_valid_words']
-            
-        except Exception as e:
-            logger.error(f"Error inicializando diccionario: {e}")
-            return 0
-    
-    def export_learned_corrections(self, export_path: Path) -> bool:
-        """Exporta correcciones aprendidas."""
-        try:
-            export_data = {
-                'corrections': self.dictionary.corrections,
-                'valid_words': list(self.dictionary.valid_words),
-                'error_patterns': self.dictionary.error_patterns,
-                'statistics': self.dictionary.get_statistics(),
-                'exported_at': datetime.now().isoformat()
-            }
-            
-            with open(export_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"Correcciones exportadas a: {export_path}")
-            return True
-        except Exception as e:
-            logger.error(f"Error exportando: {e}")
-            return False
-    
-    def get_learning_report(self) -> Dict[str, any]:
-        """Genera reporte de aprendizaje dinámico."""
-        stats = self.dictionary.get_statistics()
-        
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'learning_mode': 'dynamic',
-            'hardcoded_words': 0,  # ¡CERO palabras hardcodeadas!
-            'learned_corrections': stats['total_corrections'],
-            'learned_vocabulary': stats['valid_words'],
-            'learning_sessions': stats['learning_sessions'],
-            'auto_detected_patterns': stats['error_patterns'],
-            'last_learning_session': stats['last_session'],
-            'dictionary_health': 'dynamic_learning' if stats['total_corrections'] > 0 else 'learning_ready'
-        }
-
-# Instancia global
-dynamic_dictionary_manager = DynamicDictionaryManager()
-
 """
 CLI para gestión del diccionario dinámico.
 """
-from utils.dynamic_dictionary_manager import dynamic_dictionary_manager
+from utils.dynamic_dictionary_manager import get_manager
 
 class DynamicDictionaryMenu:
     """Menú para diccionario 100% dinámico."""
@@ -114,7 +29,7 @@ class DynamicDictionaryMenu:
     
     def _display_header(self):
         """Muestra estado del diccionario dinámico."""
-        stats = dynamic_dictionary_manager.dictionary.get_statistics()
+        stats = get_manager().dictionary.get_statistics()
         
         print("\n" + "="*60)
         print("🧠 DICCIONARIO DINÁMICO (100% SIN HARDCODING)")
@@ -137,7 +52,7 @@ class DynamicDictionaryMenu:
     
     def _show_learning_status(self):
         """Muestra estado detallado del aprendizaje."""
-        stats = dynamic_dictionary_manager.dictionary.get_statistics()
+        stats = get_manager().dictionary.get_statistics()
         
         print(f"\n🧠 ESTADO DE APRENDIZAJE DINÁMICO")
         print(f"{'='*50}")
@@ -173,20 +88,127 @@ import logging
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterator, List, NamedTuple, Optional, Any, Tuple
 import pytesseract
 import fitz  # PyMuPDF
 from PIL import Image
 import io
+import multiprocessing
+import os
 import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from bisect import bisect_left
+
+try:
+    from tesserocr import PyTessBaseAPI, PSM, OEM, RIL, iterate_level
+except ImportError:  # Fallback: pytesseract (un subproceso por llamada)
+    PyTessBaseAPI = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 # Imports del proyecto
 from utils.config.tesseract_config import tesseract_config
 from utils.dynamic_dictionary import dynamic_dictionary
+from utils.ocr_cache import OCRCache
+from utils.fast_json import dumps_bytes
 
 logger = logging.getLogger(__name__)
 
+# Expresiones regulares precompiladas (rutas calientes de texto)
+# Unión de los patrones de fila de tabla: números/fechas/códigos | valores monetarios
+_TABLE_ROW_RE = re.compile(r'\d+[\s\t]+[A-Za-z]+[\s\t]+\d+|[\$\d,\.]+[\s\t]+[A-Za-z]+')
+_MULTISPACE_RE = re.compile(r'\s{2,}')
+# Número/fecha + texto. El texto se consume con un bucle desenrollado equivalente a
+# '[^0-9]*?' seguido de '(?=\s+\d+|\s*$)': los espacios solo se consumen si les
+# sigue algo que no es dígito, así no se re-evalúa el lookahead en cada carácter
+_DATE_NUM_RE = re.compile(
+    r'(\d+[/\-\.]\d+[/\-\.]\d+|\d+)\s+'
+    r'([A-Za-z][^0-9\s]*(?:\s+(?=[^\s\d])[^0-9\s]*)*)'
+    r'(?=\s+\d|\s*$)'
+)
+_NONPRINT_RE = re.compile(r'[^\w\s\n.,;:()\-_/°%$@#áéíóúñÁÉÍÓÚÑüÜ¡!¿?|]')
+_WS_RE = re.compile(r'\s+')
+_NL_RE = re.compile(r'\n\s*\n+')
+_STRUCTURAL_PATTERNS = (
+    (re.compile(r'\b([A-Z]{2,})\s*([A-Z]{2,})\b'), r'\1 \2'),
+    (re.compile(r'\b(\d+)\s*([A-Z][a-z])'), r'\1 \2'),
+)
+_PSM_RE = re.compile(r'--psm\s+(\d+)')
+
+# Patrones que toda fila de tabla contiene (condición necesaria de
+# _looks_like_table_row); ninguno cruza saltos de línea
+_TABLE_SCAN_PATTERNS = (
+    rb'\t', rb'\|', rb':', rb'  ',
+    rb'\d+[^\S\n]+[A-Za-z]+[^\S\n]+\d+',
+    rb'[\$\d,\.]+[^\S\n]+[A-Za-z]',
+)
+_table_scan_db = None
+_table_scan_lock = threading.Lock()
+
+
+def _table_candidate_lines(text: str) -> Optional[set]:
+    """
+    Índices de las líneas que pueden ser filas de tabla, en una sola pasada.
+    
+    Usa una base Hyperscan con todos los patrones; devuelve None si Hyperscan
+    no está disponible (el llamador evalúa entonces todas las líneas).
+    """
+    global _table_scan_db
+    if hyperscan is None:
+        return None
+    
+    data = text.encode('utf-8')
+    newlines = [m.start() for m in re.finditer(b'\n', data)]
+    candidates = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        candidates.add(bisect_left(newlines, end - 1))
+    
+    # La scratch de Hyperscan no admite escaneos concurrentes
+    with _table_scan_lock:
+        if _table_scan_db is None:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=list(_TABLE_SCAN_PATTERNS),
+                ids=list(range(len(_TABLE_SCAN_PATTERNS))),
+                flags=[hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP] * len(_TABLE_SCAN_PATTERNS)
+            )
+            _table_scan_db = db
+        _table_scan_db.scan(data, match_event_handler=on_match)
+    
+    return candidates
+
+# Zoom de rasterizado: nunca por encima de la resolución de origen de la página
+_OCR_MAX_ZOOM = 2.0
+_VISUAL_MAX_ZOOM = 1.5
+_MIN_ZOOM = 1.0
+_DEFAULT_SOURCE_DPI = 150.0
+
+# Deduplicación de páginas OCR casi idénticas dentro de un PDF
+_DEDUP_MAX_HAMMING = 4
+_DEDUP_MAX_MEAN_DIFF = 2.55  # 1% de 255 sobre la miniatura
+_DEDUP_THUMB_SIZE = (128, 128)
+_DEDUP_MAX_PAGES = 256
+
+
+class _OCRPage(NamedTuple):
+    """Página pendiente de OCR: tablas del texto directo, imagen mejorada y firma."""
+    page_num: int
+    tables: List[Dict[str, Any]]
+    image: Optional[np.ndarray]
+    signature: Optional[Tuple[int, np.ndarray]]
+
+# Elementos estructurantes para detectar líneas de tabla (calibrados a zoom 2.0)
+_LINE_KERNEL_ZOOM = 2.0
+_LINE_KERNEL_LENGTH = 40
+_MIN_TABLE_AREA = 1000
+
 class AdvancedPDFProcessor:
     """Procesador PDF consolidado con diccionario dinámico y detección de tablas."""
     
@@ -205,10 +227,31 @@ class AdvancedPDFProcessor:
         # Configurar Tesseract
         pytesseract.pytesseract.tesseract_cmd = '/usr/bin/tesseract'
         
+        # API tesserocr persistente: una por hilo (la API no es thread-safe)
+        self._tess_local = threading.local()
+        self._tess_apis = []
+        self._tess_apis_lock = threading.Lock()
+        self._tess_failed = False
+        
+        # Preprocesado OCR: "fast" (mediana + Otsu) o "high" (denoising + CLAHE)
+        self.enhance_quality = os.getenv("OCR_ENHANCE_QUALITY", "fast")
+        
+        # Caché OCR por contenido de imagen (en disco si diskcache está instalado)
+        self._ocr_cache = OCRCache(self.debug_dir / ".ocr_cache")
+        
+        # Pool de procesos para páginas (se crea al primer PDF multipágina)
+        self._page_pool = None
+        self._page_pool_lock = threading.Lock()
+        
         logger.info(f"AdvancedPDFProcessor inicializado con detección de tablas")
     
-    def process_pdf(self, pdf_path: Path) -> Dict[str, Any]:
-        """Método principal para procesar PDF con detección de tablas."""
+    def process_pdf(self, pdf_path: Path, encode: bool = False) -> Dict[str, Any]:
+        """
+        Método principal para procesar PDF con detección de tablas.
+        
+        Con encode=True el resultado incluye 'result_bytes': el mismo resultado
+        ya serializado a JSON (orjson si está disponible) para escribirlo tal cual.
+        """
         try:
             logger.info(f"Iniciando procesamiento con detección de tablas: {pdf_path.name}")
             
@@ -216,64 +259,26 @@ class AdvancedPDFProcessor:
             if not pdf_path.exists():
                 return self._create_error_result(pdf_path.name, "Archivo no encontrado")
             
-            # Abrir PDF
-            pdf_document = fitz.open(str(pdf_path))
-            total_pages = len(pdf_document)
-            
-            if total_pages == 0:
-                return self._create_error_result(pdf_path.name, "PDF sin páginas")
-            
-            # Procesar todas las páginas
-            extracted_text = ""
-            detected_tables = []
-            pages_processed = 0
-            
-            for page_num in range(total_pages):
-                try:
-                    page = pdf_document[page_num]
-                    
-                    # PASO 1: Intentar extraer texto directo
-                    direct_text = page.get_text()
-                    
-                    # PASO 2: Detectar tablas en la página
-                    page_tables = self._detect_tables_in_page(page, page_num + 1)
+            # Abrir PDF (se cierra aunque falle el procesamiento)
+            with fitz.open(str(pdf_path)) as pdf_document:
+                total_pages = len(pdf_document)
+                
+                if total_pages == 0:
+                    return self._create_error_result(pdf_path.name, "PDF sin páginas")
+                
+                # Procesar todas las páginas (en paralelo si hay varias)
+                detected_tables = []
+                page_texts = []
+                
+                for page_text, page_tables in self._process_pages(pdf_path, pdf_document, total_pages):
                     detected_tables.extend(page_tables)
-                    
-                    if len(direct_text.strip()) > 50:
-                        # Texto directo disponible
-                        extracted_text += f"\n--- Página {page_num + 1} ---\n"
-                        extracted_text += direct_text
-                        
-                        # Agregar tablas detectadas al texto
-                        if page_tables:
-                            extracted_text += f"\n\n=== TABLAS DETECTADAS EN PÁGINA {page_num + 1} ===\n"
-                            for i, table in enumerate(page_tables):
-                                extracted_text += f"\n--- Tabla {i + 1} ---\n"
-                                extracted_text += self._format_table_as_text(table)
-                        
-                        pages_processed += 1
-                    else:
-                        # Usar OCR con detección de tablas
-                        page_text, page_tables_ocr = self._process_page_with_ocr_and_tables(page, page_num + 1)
-                        if page_text:
-                            extracted_text += f"\n--- Página {page_num + 1} (OCR) ---\n"
-                            extracted_text += page_text
-                            
-                            # Agregar tablas OCR
-                            if page_tables_ocr:
-                                detected_tables.extend(page_tables_ocr)
-                                extracted_text += f"\n\n=== TABLAS OCR EN PÁGINA {page_num + 1} ===\n"
-                                for i, table in enumerate(page_tables_ocr):
-                                    extracted_text += f"\n--- Tabla OCR {i + 1} ---\n"
-                                    extracted_text += self._format_table_as_text(table)
-                            
-                            pages_processed += 1
+                    if page_text is not None:
+                        page_texts.append(page_text)
                 
-                except Exception as e:
-                    logger.warning(f"Error procesando página {page_num + 1}: {e}")
-                    continue
-            
-            pdf_document.close()
+                # La limpieza (diccionario + regex) necesita el texto completo
+                pages_processed = len(page_texts)
+                extracted_text = "".join(page_texts)
+                del page_texts
             
             # Limpiar texto final
             cleaned_text = self._clean_text(extracted_text, level="enhanced")
@@ -309,6 +314,9 @@ class AdvancedPDFProcessor:
                 }
             }
             
+            if encode:
+                result['result_bytes'] = dumps_bytes(result)
+            
             logger.info(f"Procesamiento completado: {pages_processed}/{total_pages} páginas, {len(detected_tables)} tablas")
             return result
             
@@ -316,13 +324,180 @@ class AdvancedPDFProcessor:
             logger.error(f"Error general procesando PDF: {e}", exc_info=True)
             return self._create_error_result(pdf_path.name, str(e))
 
-    def _detect_tables_in_page(self, page, page_number: int) -> List[Dict[str, Any]]:
-        """Detecta tablas en una página usando análisis de estructura."""
+    def _process_pages(self, pdf_path: Path, pdf_document, total_pages: int) -> Iterator[Tuple[Optional[str], List[Dict[str, Any]]]]:
+        """
+        Procesa las páginas y entrega (texto, tablas) de cada una en orden.
+        
+        Con varias páginas se reparten en un pool de procesos; dentro de un
+        proceso hijo (p. ej. el pool del controlador) se procesa en serie.
+        
+        Las páginas OCR ya vistas de este PDF, (pHash, miniatura, texto), viven
+        en una lista local: el procesador es compartido entre hilos.
+        """
+        page_dedup = []
+        if total_pages < 2 or multiprocessing.parent_process() is not None:
+            for i in range(total_pages):
+                yield self._process_page(pdf_document[i], i, page_dedup)
+            return
+        
+        results = {}
+        next_page = 0
+        try:
+            pool = self._get_page_pool()
+            
+            # Fase 1 (pool): texto directo, tablas e imagen mejorada con su firma
+            prepared = [pool.submit(_prepare_single_page, str(pdf_path), i) for i in range(total_pages)]
+            
+            # Deduplicación en este proceso, en orden de página: solo la primera de
+            # cada grupo de páginas casi idénticas va al OCR (fase 2, también en el pool)
+            known_pages = []  # (pHash, miniatura, página que hace el OCR)
+            ocr_futures = {}
+            pending = {}
+            for i, future in enumerate(prepared):
+                item = future.result()
+                if not isinstance(item, _OCRPage):
+                    results[i] = item
+                    continue
+                owner = None if item.signature is None else self._match_page(item.signature, known_pages)
+                if owner is None:
+                    owner = i
+                    ocr_futures[i] = pool.submit(_ocr_single_image, item.image, i + 1)
+                    if item.signature is not None and len(known_pages) < _DEDUP_MAX_PAGES:
+                        known_pages.append((*item.signature, i))
+                pending[i] = (item._replace(image=None, signature=None), owner)
+            
+            # Cada página se entrega en cuanto tiene su OCR (o el de su página gemela)
+            for i in range(total_pages):
+                if i in pending:
+                    item, owner = pending.pop(i)
+                    results[i] = self._finish_ocr_page(item, ocr_futures[owner].result())
+                yield results.pop(i)
+                next_page = i + 1
+        except Exception as e:
+            # El pool es compartido con otros hilos: solo close() lo cierra
+            logger.warning(f"Pool de páginas no disponible, procesando en serie: {e}")
+        
+        # Páginas pendientes (si el pool falló) se procesan en este proceso
+        for i in range(next_page, total_pages):
+            yield results.pop(i) if i in results else self._process_page(pdf_document[i], i, page_dedup)
+    
+    def _process_page(self, page, page_num: int, page_dedup: Optional[List] = None) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """
+        Procesa una página: texto directo o OCR, más tablas detectadas.
+        
+        page_dedup son las páginas OCR ya vistas del mismo PDF (o None).
+        Devuelve (None, tablas) si la página no aportó texto.
+        """
+        try:
+            prepared = self._prepare_page(page, page_num)
+            if isinstance(prepared, _OCRPage):
+                text = self._ocr_page_text(prepared.image, page_num + 1, page_dedup)
+                prepared = self._finish_ocr_page(prepared, text)
+            return prepared
+        
+        except Exception as e:
+            logger.warning(f"Error procesando página {page_num + 1}: {e}")
+            return None, []
+    
+    def _prepare_page(self, page, page_num: int, with_signature: bool = False):
+        """
+        Todo lo que no es OCR de una página.
+        
+        Devuelve (texto, tablas) si la página tiene texto directo, o un _OCRPage con
+        la imagen mejorada (y su firma si with_signature) para el OCR posterior.
+        """
+        try:
+            # PASO 1: Intentar extraer texto directo
+            direct_text = page.get_text()
+            
+            # PASO 2: Detectar tablas en la página (sin volver a extraer el texto)
+            page_tables = self._detect_tables_in_page(page, page_num + 1, page_text=direct_text)
+            
+            if len(direct_text.strip()) > 50:
+                # Texto directo disponible
+                parts = [f"\n--- Página {page_num + 1} ---\n", direct_text]
+                
+                # Agregar tablas detectadas al texto
+                if page_tables:
+                    parts.append(f"\n\n=== TABLAS DETECTADAS EN PÁGINA {page_num + 1} ===\n")
+                    for i, table in enumerate(page_tables):
+                        parts.append(f"\n--- Tabla {i + 1} ---\n")
+                        parts.append(self._format_table_as_text(table))
+                
+                return "".join(parts), page_tables
+            
+            # Sin texto directo: preparar la imagen para OCR
+            try:
+                image = self._prepare_ocr_image(page)
+            except Exception as e:
+                logger.error(f"Error en OCR con tablas página {page_num + 1}: {e}")
+                return None, page_tables
+            
+            signature = None
+            if with_signature and image.ndim == 2:
+                signature = self._page_signature(image)
+            return _OCRPage(page_num, page_tables, image, signature)
+        
+        except Exception as e:
+            logger.warning(f"Error procesando página {page_num + 1}: {e}")
+            return None, []
+    
+    def _finish_ocr_page(self, prepared: _OCRPage, ocr_text: str) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """Arma (texto, tablas) de una página a partir de su texto OCR."""
+        page_num = prepared.page_num
+        
+        # Detectar tablas en el texto OCR
+        page_tables_ocr = self._find_table_patterns_in_text(ocr_text, page_num + 1)
+        ocr_text = ocr_text.strip()
+        if not ocr_text:
+            return None, prepared.tables
+        
+        parts = [f"\n--- Página {page_num + 1} (OCR) ---\n", ocr_text]
+        
+        # Agregar tablas OCR
+        if page_tables_ocr:
+            parts.append(f"\n\n=== TABLAS OCR EN PÁGINA {page_num + 1} ===\n")
+            for i, table in enumerate(page_tables_ocr):
+                parts.append(f"\n--- Tabla OCR {i + 1} ---\n")
+                parts.append(self._format_table_as_text(table))
+        
+        return "".join(parts), prepared.tables + page_tables_ocr
+    
+    def _get_page_pool(self) -> ProcessPoolExecutor:
+        """Pool de procesos para páginas, creado bajo demanda y reutilizado."""
+        with self._page_pool_lock:
+            if self._page_pool is None:
+                mp_context = None
+                if sys.platform.startswith('linux'):
+                    # Evita fork() de un proceso con hilos (guardado en segundo plano)
+                    mp_context = multiprocessing.get_context('forkserver')
+                    mp_context.set_forkserver_preload(['models.pdf_processor'])
+                
+                self._page_pool = ProcessPoolExecutor(
+                    max_workers=os.cpu_count() or 1,
+                    mp_context=mp_context
+                )
+            return self._page_pool
+    
+    def _shutdown_page_pool(self):
+        """Cierra el pool de páginas si existe (solo desde close())."""
+        with self._page_pool_lock:
+            pool, self._page_pool = self._page_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _detect_tables_in_page(self, page, page_number: int, page_text: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Detecta tablas en una página usando análisis de estructura.
+        
+        page_text permite reutilizar el texto ya extraído de la página.
+        """
         try:
             tables = []
             
             # MÉTODO 1: Buscar tablas en texto directo (detectar patrones tabulares)
-            page_text = page.get_text()
+            if page_text is None:
+                page_text = page.get_text()
             text_tables = self._find_table_patterns_in_text(page_text, page_number)
             tables.extend(text_tables)
             
@@ -341,48 +516,35 @@ class AdvancedPDFProcessor:
         tables = []
         
         try:
+            # Descartar de una vez las líneas sin ningún patrón de tabla
+            candidates = _table_candidate_lines(text)
+            if candidates is not None and not candidates:
+                return tables
+            
+            # Con el prefiltro solo se recorren las líneas candidatas: una tabla es
+            # una racha de filas en líneas consecutivas
             lines = text.split('\n')
+            indices = range(len(lines)) if candidates is None else sorted(candidates)
             current_table = []
-            in_table = False
+            previous_row = -2
             
-            for line in lines:
-                line = line.strip()
+            for index in indices:
+                line = lines[index].strip()
                 
                 # Detectar líneas que parecen filas de tabla
-                if self._looks_like_table_row(line):
-                    if not in_table:
-                        in_table = True
-                        current_table = []
-                    current_table.append(line)
-                else:
-                    if in_table and len(current_table) >= 2:
-                        # Guardar tabla encontrada
-                        table_data = self._parse_table_from_lines(current_table)
-                        if table_data:
-                            tables.append({
-                                'page': page_number,
-                                'method': 'text_pattern',
-                                'rows': len(table_data),
-                                'cols': len(table_data[0]) if table_data else 0,
-                                'data': table_data,
-                                'raw_lines': current_table.copy()
-                            })
-                    
-                    in_table = False
+                if not self._looks_like_table_row(line):
+                    self._append_text_table(tables, current_table, page_number)
                     current_table = []
+                    continue
+                
+                if index != previous_row + 1:
+                    self._append_text_table(tables, current_table, page_number)
+                    current_table = []
+                current_table.append(line)
+                previous_row = index
             
             # Procesar tabla final si existe
-            if in_table and len(current_table) >= 2:
-                table_data = self._parse_table_from_lines(current_table)
-                if table_data:
-                    tables.append({
-                        'page': page_number,
-                        'method': 'text_pattern',
-                        'rows': len(table_data),
-                        'cols': len(table_data[0]) if table_data else 0,
-                        'data': table_data,
-                        'raw_lines': current_table.copy()
-                    })
+            self._append_text_table(tables, current_table, page_number)
             
             return tables
             
@@ -390,27 +552,35 @@ class AdvancedPDFProcessor:
             logger.error(f"Error buscando patrones de tabla: {e}")
             return []
 
+    def _append_text_table(self, tables: List[Dict[str, Any]], table_lines: List[str], page_number: int):
+        """Agrega la tabla formada por table_lines si tiene al menos dos filas válidas."""
+        if len(table_lines) < 2:
+            return
+        
+        table_data = self._parse_table_from_lines(table_lines)
+        if table_data:
+            tables.append({
+                'page': page_number,
+                'method': 'text_pattern',
+                'rows': len(table_data),
+                'cols': len(table_data[0]) if table_data else 0,
+                'data': table_data,
+                'raw_lines': table_lines.copy()
+            })
+
     def _looks_like_table_row(self, line: str) -> bool:
         """Determina si una línea parece una fila de tabla."""
-        if len(line.strip()) < 10:
+        if len(line) < 10 or len(line.strip()) < 10:
             return False
         
-        # Buscar separadores comunes de tabla
-        separators = ['\t', '  ', ' | ', '|', ':']
-        
-        for sep in separators:
-            if line.count(sep) >= 2:
-                return True
-        
-        # Buscar patrones de números/fechas/códigos
-        if re.search(r'\d+[\s\t]+[A-Za-z]+[\s\t]+\d+', line):
+        # Buscar separadores comunes de tabla (' | ' implica '|', no se cuenta aparte);
+        # cada count() es un barrido en C y el 'or' corta en el primer acierto
+        if (line.count('\t') >= 2 or line.count('|') >= 2 or
+                line.count(':') >= 2 or line.count('  ') >= 2):
             return True
         
-        # Buscar patrones de valores monetarios
-        if re.search(r'[\$\d,\.]+[\s\t]+[A-Za-z]+', line):
-            return True
-        
-        return False
+        # Patrones de números/fechas/códigos o valores monetarios en una sola búsqueda
+        return _TABLE_ROW_RE.search(line) is not None
 
     def _parse_table_from_lines(self, lines: List[str]) -> List[List[str]]:
         """Convierte líneas de texto en estructura de tabla."""
@@ -427,7 +597,7 @@ class AdvancedPDFProcessor:
                 
                 # MÉTODO 2: Separación por espacios múltiples
                 elif '  ' in line:
-                    row = [cell.strip() for cell in re.split(r'\s{2,}', line) if cell.strip()]
+                    row = [cell.strip() for cell in _MULTISPACE_RE.split(line) if cell.strip()]
                 
                 # MÉTODO 3: Separación por pipes
                 elif '|' in line:
@@ -436,7 +606,7 @@ class AdvancedPDFProcessor:
                 # MÉTODO 4: Separación inteligente por patrones
                 else:
                     # Buscar patrones de fecha/número + texto
-                    matches = re.findall(r'(\d+[/\-\.]\d+[/\-\.]\d+|\d+)\s+([A-Za-z][^0-9]*?)(?=\s+\d+|\s*$)', line)
+                    matches = _DATE_NUM_RE.findall(line)
                     if matches:
                         row = [match[0].strip() for match in matches] + [matches[-1][1].strip()]
                 
@@ -459,53 +629,63 @@ class AdvancedPDFProcessor:
     def _detect_tables_by_visual_analysis(self, page, page_number: int) -> List[Dict[str, Any]]:
         """Detecta tablas mediante análisis visual de la página."""
         try:
-            # Convertir página a imagen
-            mat = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
-            img_data = mat.tobytes("png")
-            img_array = np.frombuffer(img_data, np.uint8)
-            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+            # Convertir página a imagen (RGB); la detección de líneas tolera menos DPI
+            zoom = self._adaptive_zoom(page, _VISUAL_MAX_ZOOM)
+            img = self._render_page(page, zoom)
+            
+            # Kernels y área mínima proporcionales al zoom usado
+            ratio = zoom / _LINE_KERNEL_ZOOM
+            length = max(int(round(_LINE_KERNEL_LENGTH * ratio)), 1)
+            h_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (length, 1))
+            v_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, length))
+            min_area = _MIN_TABLE_AREA * ratio * ratio
             
-            # Detectar líneas horizontales y verticales
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            # Detectar líneas horizontales y verticales sobre la imagen binarizada
+            # una sola vez (trazos en blanco sobre fondo negro)
+            gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
             
             # Detectar líneas horizontales
-            horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-            horizontal_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, horizontal_kernel)
+            horizontal_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, h_kernel)
             
             # Detectar líneas verticales
-            vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
-            vertical_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, vertical_kernel)
+            vertical_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, v_kernel)
             
-            # Combinar líneas
-            table_mask = cv2.addWeighted(horizontal_lines, 0.5, vertical_lines, 0.5, 0.0)
+            # Combinar líneas (OR binario en lugar de mezcla ponderada)
+            table_mask = cv2.bitwise_or(horizontal_lines, vertical_lines)
             
             # Encontrar contornos de posibles tablas
             contours, _ = cv2.findContours(table_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
-            tables = []
-            for i, contour in enumerate(contours):
+            # Regiones candidatas (filtrar tablas pequeñas)
+            regions = []
+            for contour in contours:
                 area = cv2.contourArea(contour)
-                if area > 1000:  # Filtrar tablas pequeñas
-                    x, y, w, h = cv2.boundingRect(contour)
-                    
-                    # Extraer región de la tabla
-                    table_region = img[y:y+h, x:x+w]
-                    
-                    # OCR de la región de tabla
-                    table_text = pytesseract.image_to_string(
-                        table_region, 
-                        lang=self.tesseract_lang,
-                        config='--psm 6'
-                    )
-                    
-                    if len(table_text.strip()) > 20:
-                        tables.append({
-                            'page': page_number,
-                            'method': 'visual_analysis',
-                            'bbox': {'x': x, 'y': y, 'width': w, 'height': h},
-                            'text': table_text.strip(),
-                            'area': area
-                        })
+                if area > min_area:
+                    regions.append((cv2.boundingRect(contour), area))
+            
+            if not regions:
+                return []
+            
+            # Un solo OCR de la página con geometría por palabra para todas las regiones
+            words = self._ocr_words(gray, config='--psm 6')
+            
+            tables = []
+            for (x, y, w, h), area in regions:
+                table_text = self._words_in_region(words, x, y, w, h)
+                
+                if len(table_text.strip()) > 20:
+                    # bbox y área en puntos PDF: el zoom de rasterizado varía por página
+                    tables.append({
+                        'page': page_number,
+                        'method': 'visual_analysis',
+                        'bbox': {
+                            'x': round(x / zoom, 2), 'y': round(y / zoom, 2),
+                            'width': round(w / zoom, 2), 'height': round(h / zoom, 2)
+                        },
+                        'text': table_text.strip(),
+                        'area': round(area / (zoom * zoom), 2)
+                    })
             
             return tables
             
@@ -513,35 +693,253 @@ class AdvancedPDFProcessor:
             logger.error(f"Error en análisis visual de tablas: {e}")
             return []
 
-    def _process_page_with_ocr_and_tables(self, page, page_number: int) -> Tuple[str, List[Dict[str, Any]]]:
-        """Procesa una página usando OCR con detección específica de tablas."""
+    def _prepare_ocr_image(self, page) -> np.ndarray:
+        """Rasteriza (RGB, sin superar la resolución de origen) y mejora la página para OCR."""
+        img = self._render_page(page, self._adaptive_zoom(page, _OCR_MAX_ZOOM))
+        return self._enhance_image(img, quality=self.enhance_quality)
+    
+    def _ocr_page_text(self, image: np.ndarray, page_number: int, page_dedup: Optional[List] = None) -> str:
+        """OCR general de una página (reutiliza el de una página casi idéntica del mismo PDF)."""
         try:
-            # Convertir página a imagen
-            mat = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
-            img_data = mat.tobytes("png")
-            img_array = np.frombuffer(img_data, np.uint8)
-            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-            
-            # Mejorar imagen
-            enhanced_img = self._enhance_image(img)
-            
-            # OCR general
-            ocr_config = self.tesseract_config.get_ocr_config('document')
-            text = pytesseract.image_to_string(
-                enhanced_img, 
-                lang=self.tesseract_lang, 
-                config=ocr_config
-            )
-            
-            # Detectar tablas en el texto OCR
-            tables = self._find_table_patterns_in_text(text, page_number)
-            
-            return text.strip(), tables
-            
+            text = self._find_similar_page_text(image, page_dedup)
+            if text is None:
+                ocr_config = self.tesseract_config.get_ocr_config('document')
+                text = self._ocr_image(image, config=ocr_config)
+                self._remember_page_text(image, text, page_dedup)
+            return text
+        
         except Exception as e:
             logger.error(f"Error en OCR con tablas página {page_number}: {e}")
-            return "", []
+            return ""
 
+    def _page_signature(self, image: np.ndarray) -> Tuple[int, np.ndarray]:
+        """
+        Hash perceptual (pHash DCT de 64 bits) y miniatura para verificar.
+        
+        El hash agrupa candidatas; la miniatura confirma el parecido real.
+        """
+        small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+        low = cv2.dct(small)[:8, :8]
+        bits = (low > np.median(low)).ravel()
+        phash = int.from_bytes(np.packbits(bits).tobytes(), 'big')
+        thumb = cv2.resize(image, _DEDUP_THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        return phash, thumb
+    
+    def _match_page(self, signature: Tuple[int, np.ndarray], entries: List) -> Any:
+        """Dato de la primera entrada (pHash, miniatura, dato) casi idéntica a la firma, o None."""
+        phash, thumb = signature
+        for known_hash, known_thumb, value in entries:
+            if bin(phash ^ known_hash).count('1') > _DEDUP_MAX_HAMMING:
+                continue
+            diff = cv2.absdiff(thumb, known_thumb)
+            if cv2.mean(diff)[0] < _DEDUP_MAX_MEAN_DIFF:
+                return value
+        return None
+    
+    def _find_similar_page_text(self, image: np.ndarray, page_dedup: Optional[List]) -> Optional[str]:
+        """Texto OCR de una página ya vista casi idéntica, o None."""
+        if image.ndim != 2 or not page_dedup:
+            return None
+        return self._match_page(self._page_signature(image), page_dedup)
+    
+    def _remember_page_text(self, image: np.ndarray, text: str, page_dedup: Optional[List]):
+        """Recuerda el OCR de una página para las siguientes del mismo PDF."""
+        if page_dedup is None or image.ndim != 2 or len(page_dedup) >= _DEDUP_MAX_PAGES:
+            return
+        phash, thumb = self._page_signature(image)
+        page_dedup.append((phash, thumb, text))
+    
+    def _adaptive_zoom(self, page, max_zoom: float) -> float:
+        """
+        Zoom de rasterizado según la resolución efectiva de las imágenes de la página.
+        
+        Un escaneo de baja resolución no gana detalle al ampliarlo: el zoom se
+        limita a DPI_origen / 72, entre _MIN_ZOOM y max_zoom.
+        """
+        source_dpi = 0.0
+        try:
+            for info in page.get_image_info():
+                x0, _, x1, _ = info['bbox']
+                if x1 > x0 and info.get('width'):
+                    source_dpi = max(source_dpi, info['width'] * 72.0 / (x1 - x0))
+        except Exception as e:
+            logger.debug(f"No se pudo obtener la resolución de origen: {e}")
+        
+        zoom = (source_dpi or _DEFAULT_SOURCE_DPI) / 72.0
+        return min(max_zoom, max(_MIN_ZOOM, zoom))
+    
+    def _render_page(self, page, zoom: float) -> np.ndarray:
+        """
+        Rasteriza una página directamente a un array RGB, sin codificar PNG.
+        
+        PyMuPDF entrega los píxeles en orden RGB (no BGR como OpenCV).
+        """
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        if pix.n == 1:
+            # Páginas en escala de grises: expandir a 3 canales
+            return cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+        # samples es una copia en bytes: el array no depende del Pixmap (solo lectura)
+        return img
+    
+    def _get_tess_api(self):
+        """
+        Devuelve la API tesserocr del hilo actual, o None si no está disponible.
+        
+        Se crea una por hilo y proceso: una API heredada por fork no se reutiliza.
+        """
+        if PyTessBaseAPI is None or self._tess_failed:
+            return None
+        
+        local = self._tess_local
+        pid = os.getpid()
+        if getattr(local, 'api', None) is None or local.pid != pid:
+            try:
+                api = PyTessBaseAPI(
+                    lang=self.tesseract_lang, psm=PSM.SINGLE_BLOCK, oem=OEM.DEFAULT
+                )
+            except Exception as e:
+                logger.warning(f"tesserocr no disponible, usando pytesseract: {e}")
+                local.api = None
+                self._tess_failed = True
+                return None
+            local.api = api
+            local.pid = pid
+            with self._tess_apis_lock:
+                self._tess_apis.append((api, pid))
+        return local.api
+    
+    def _ocr_image(self, image: np.ndarray, config: str = '--psm 6') -> str:
+        """
+        OCR de una imagen reutilizando la API tesserocr (sin lanzar procesos).
+        
+        Configuraciones con variables (-c) o sin tesserocr usan pytesseract.
+        """
+        # Páginas o recortes idénticos (re-procesos, portadas) no repiten OCR
+        cache_key = (self._ocr_cache.image_key(image), self.tesseract_lang, config)
+        cached = self._ocr_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        text = self._run_ocr(image, config)
+        self._ocr_cache.set(cache_key, text)
+        return text
+    
+    def _run_ocr(self, image: np.ndarray, config: str) -> str:
+        """Ejecuta Tesseract sobre la imagen (tesserocr o pytesseract)."""
+        psm_match = _PSM_RE.search(config)
+        api = None if '-c' in config.split() else self._get_tess_api()
+        if api is None:
+            return pytesseract.image_to_string(image, lang=self.tesseract_lang, config=config)
+        
+        # Las imágenes de _render_page ya están en RGB
+        pil_image = Image.fromarray(image)
+        
+        # Cada hilo usa su propia API: no hace falta serializar
+        api.SetPageSegMode(int(psm_match.group(1)) if psm_match else PSM.SINGLE_BLOCK)
+        api.SetImage(pil_image)
+        return api.GetUTF8Text()
+    
+    def _ocr_words(self, image: np.ndarray, config: str = '--psm 6') -> Dict[str, np.ndarray]:
+        """
+        OCR de una imagen con geometría por palabra (columnas como arrays).
+        
+        Devuelve 'left', 'top', 'right', 'bottom', 'line' y 'text'; 'line'
+        identifica la línea de Tesseract a la que pertenece cada palabra.
+        """
+        cache_key = (self._ocr_cache.image_key(image), self.tesseract_lang, config + ' #words')
+        cached = self._ocr_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        boxes, lines, texts = self._run_ocr_words(image, config)
+        boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        words = {
+            'left': boxes[:, 0],
+            'top': boxes[:, 1],
+            'right': boxes[:, 2],
+            'bottom': boxes[:, 3],
+            'line': np.asarray(lines, dtype=np.int32),
+            'text': np.asarray(texts, dtype=object),
+        }
+        self._ocr_cache.set(cache_key, words)
+        return words
+    
+    def _run_ocr_words(self, image: np.ndarray, config: str) -> Tuple[List[Tuple[int, int, int, int]], List[int], List[str]]:
+        """Ejecuta Tesseract y devuelve cajas (x1, y1, x2, y2), línea y texto por palabra."""
+        boxes, lines, texts = [], [], []
+        
+        api = None if '-c' in config.split() else self._get_tess_api()
+        if api is None:
+            data = pytesseract.image_to_data(
+                image, lang=self.tesseract_lang, config=config,
+                output_type=pytesseract.Output.DICT
+            )
+            line_ids = {}
+            for i, text in enumerate(data['text']):
+                if not text.strip():
+                    continue
+                key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+                left, top = data['left'][i], data['top'][i]
+                boxes.append((left, top, left + data['width'][i], top + data['height'][i]))
+                lines.append(line_ids.setdefault(key, len(line_ids)))
+                texts.append(text)
+            return boxes, lines, texts
+        
+        psm_match = _PSM_RE.search(config)
+        api.SetPageSegMode(int(psm_match.group(1)) if psm_match else PSM.SINGLE_BLOCK)
+        api.SetImage(Image.fromarray(image))
+        api.Recognize()
+        iterator = api.GetIterator()
+        if iterator is None:
+            return boxes, lines, texts
+        
+        line_id = -1
+        for word in iterate_level(iterator, RIL.WORD):
+            if word.IsAtBeginningOf(RIL.TEXTLINE):
+                line_id += 1
+            text = word.GetUTF8Text(RIL.WORD)
+            if not text or not text.strip():
+                continue
+            boxes.append(word.BoundingBox(RIL.WORD))
+            lines.append(max(line_id, 0))
+            texts.append(text)
+        return boxes, lines, texts
+    
+    def _words_in_region(self, words: Dict[str, np.ndarray], x: int, y: int, w: int, h: int) -> str:
+        """Texto de las palabras contenidas en la región, en orden de lectura."""
+        mask = (
+            (words['left'] >= x) & (words['right'] <= x + w) &
+            (words['top'] >= y) & (words['bottom'] <= y + h)
+        )
+        indices = np.flatnonzero(mask)
+        if indices.size == 0:
+            return ""
+        
+        # Tesseract entrega las palabras en orden de lectura: agrupar por línea
+        lines = []
+        current_line = None
+        for i in indices:
+            if words['line'][i] != current_line:
+                current_line = words['line'][i]
+                lines.append([])
+            lines[-1].append(words['text'][i])
+        
+        return '\n'.join(' '.join(line) for line in lines)
+    
+    def close(self):
+        """Libera las APIs tesserocr de cada hilo, el pool de páginas y la caché OCR."""
+        self._shutdown_page_pool()
+        self._ocr_cache.close()
+        with self._tess_apis_lock:
+            apis, self._tess_apis = self._tess_apis, []
+        pid = os.getpid()
+        for api, api_pid in apis:
+            if api_pid == pid:
+                api.End()
+        # Los hilos que vuelvan a hacer OCR crean una API nueva
+        self._tess_local = threading.local()
+    
     def _format_table_as_text(self, table: Dict[str, Any]) -> str:
         """Formatea una tabla detectada como texto legible."""
         try:
@@ -567,22 +965,31 @@ class AdvancedPDFProcessor:
             logger.error(f"Error formateando tabla: {e}")
             return "Error formateando tabla"
 
-    def _enhance_image(self, image: np.ndarray) -> np.ndarray:
-        """Mejora imagen para OCR."""
+    def _enhance_image(self, image: np.ndarray, quality: str = "fast") -> np.ndarray:
+        """
+        Mejora imagen para OCR.
+        
+        Por defecto: mediana 3x3 + umbral global de Otsu (una pasada por píxel).
+        quality="high" usa denoising no local + CLAHE + umbral adaptativo.
+        """
         try:
             if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
             else:
-                gray = image.copy()
+                gray = image
             
-            denoised = cv2.fastNlMeansDenoising(gray)
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            enhanced = clahe.apply(denoised)
+            if quality == "high":
+                denoised = cv2.fastNlMeansDenoising(gray)
+                clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+                enhanced = clahe.apply(denoised)
+                
+                return cv2.adaptiveThreshold(
+                    enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+                    cv2.THRESH_BINARY, 11, 2
+                )
             
-            thresh = cv2.adaptiveThreshold(
-                enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                cv2.THRESH_BINARY, 11, 2
-            )
+            blurred = cv2.medianBlur(gray, 3)
+            _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
             
             return thresh
             
@@ -599,27 +1006,26 @@ class AdvancedPDFProcessor:
             if level in ["enhanced", "aggressive"]:
                 text = self.dynamic_dict.correct_text(text, "official_document")
             
-            text = re.sub(r'[^\w\s\n.,;:()\-_/°%$@#áéíóúñÁÉÍÓÚÑüÜ¡!¿?|]', ' ', text)
-            text = re.sub(r'\s+', ' ', text)
-            text = re.sub(r'\n\s*\n+', '\n\n', text)
+            text = _NONPRINT_RE.sub(' ', text)
+            text = _WS_RE.sub(' ', text)
+            text = _NL_RE.sub('\n\n', text)
             
             if level == "aggressive":
-                structural_patterns = [
-                    (r'\b([A-Z]{2,})\s*([A-Z]{2,})\b', r'\1 \2'),
-                    (r'\b(\d+)\s*([A-Z][a-z])', r'\1 \2'),
-                ]
-                
-                for pattern, replacement in structural_patterns:
-                    text = re.sub(pattern, replacement, text)
+                for pattern, replacement in _STRUCTURAL_PATTERNS:
+                    text = pattern.sub(replacement, text)
             
             min_length = 3 if level == "basic" else 5
-            lines = []
-            for line in text.split('\n'):
-                line = line.strip()
-                if len(line) > min_length or line.isdigit() or not line:
-                    lines.append(line)
             
-            return '\n'.join(lines)
+            # _WS_RE ya convirtió los saltos de línea en espacios: lo habitual es
+            # una sola línea y no hace falta dividir ni volver a unir
+            if '\n' not in text:
+                line = text.strip()
+                return line if len(line) > min_length or line.isdigit() or not line else ""
+            
+            return '\n'.join([
+                line for raw_line in text.split('\n')
+                if len(line := raw_line.strip()) > min_length or line.isdigit() or not line
+            ])
             
         except Exception as e:
             logger.warning(f"Error limpiando texto: {e}")
@@ -645,6 +1051,19 @@ class AdvancedPDFProcessor:
             }
         }
 
+def _prepare_single_page(pdf_path_str: str, page_num: int):
+    """
+    Fase previa al OCR de una página en un proceso del pool (ver _prepare_page).
+    
+    Los documentos fitz no son serializables: cada tarea abre el suyo.
+    """
+    with fitz.open(pdf_path_str) as pdf_document:
+        return pdf_processor._prepare_page(pdf_document[page_num], page_num, with_signature=True)
+
+def _ocr_single_image(image: np.ndarray, page_number: int) -> str:
+    """OCR de una imagen de página ya mejorada en un proceso del pool."""
+    return pdf_processor._ocr_page_text(image, page_number)
+
 # Instancia global para compatibilidad
 pdf_processor = AdvancedPDFProcessor()
 # Auto-generated comment - 20:13:37
@@ -658,3 +1077,4 @@ pdf_processor = AdvancedPDFProcessor()
 # Auto-generated comment - 20:13:38
 
 # Auto-generated comment - 20:13:38
+
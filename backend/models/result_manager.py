@@ -3,12 +3,59 @@ Gestor de resultados - REFACTORIZADO sin duplicaciones.
 """
 import json
 import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, Any, Tuple, List, Optional
+from typing import Dict, Any, Tuple, List, Optional, Union, Callable
 from .document import Document
+from utils.fast_json import dumps_bytes
 
 logger = logging.getLogger(__name__)
 
+# Encabezados de tabla en el contenido exportado
+_TABLE_RE = re.compile(r'\*\*Tabla \d+')
+
+# Atributos del Document usados en el Markdown (una sola lectura en C)
+_MD_ATTRS = attrgetter(
+    'pages', 'word_count', 'character_count', 'tables', 'method', 'success', 'content', 'created_at'
+)
+
+# Resultado de un archivo que no se escribió por no tener contenido
+SKIPPED = "skipped"
+
+# Buffer de escritura: los textos OCR grandes salen en pocas llamadas write()
+_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Máximo de buffers por llamada a os.writev (IOV_MAX del sistema)
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+
+class LazyFile:
+    """Archivo que solo se crea (junto con su carpeta) si hay contenido que escribir."""
+    
+    __slots__ = ('path', 'content_supplier')
+    
+    def __init__(self, path: Path, content_supplier: Callable[[], Any]):
+        self.path = path
+        self.content_supplier = content_supplier
+    
+    def write(self, writer: Callable[[Path, Any], bool]) -> Union[bool, str]:
+        """Escribe con `writer(path, contenido)` o devuelve SKIPPED si está vacío."""
+        content = self.content_supplier()
+        if not content:
+            return SKIPPED
+        self.path.parent.mkdir(exist_ok=True)
+        return writer(self.path, content)
+
+
 class ResultManager:
     """Maneja guardado de resultados sin duplicaciones."""
     
@@ -22,6 +69,20 @@ class ResultManager:
             'json': '.json', 
             'md': '.md'
         }
+        
+        # Conteo de archivos cacheado: (clave, conteos)
+        self._counts_cache = None
+        
+        # Numeración de carpetas: se lee el directorio una vez al iniciar
+        self._folder_lock = threading.Lock()
+        self._next_folder_num = self._scan_next_folder_num()
+        
+        # Hilos para escribir los archivos de un documento en paralelo
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="result-io")
+    
+    def close(self):
+        """Espera las escrituras pendientes y libera el pool de E/S."""
+        self._io_pool.shutdown(wait=True)
     
     # ========== MÉTODOS AUXILIARES (ELIMINAN DUPLICACIONES) ==========
     
@@ -30,11 +91,15 @@ class ResultManager:
         extension = self.file_extensions.get(file_type, f'.{file_type}')
         return output_dir / f"{base_name}{extension}"
     
-    def _safe_write_file(self, file_path: Path, content: str, fallback_content: str = None) -> bool:
-        """Escritura segura de archivo - ELIMINA duplicación de escritura."""
+    def _safe_write_file(self, file_path: Path, content: Union[str, bytes], fallback_content: str = None) -> bool:
+        """Escritura segura de archivo - ELIMINA duplicación de escritura (acepta bytes UTF-8 ya codificados)."""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            if isinstance(content, bytes):
+                with open(file_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                    f.write(content)
+            else:
+                with open(file_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+                    f.write(content)
             logger.debug(f"Archivo guardado: {file_path.name}")
             return True
             
@@ -53,11 +118,48 @@ class ResultManager:
             
             return False
     
+    def _safe_writev_file(self, file_path: Path, lines: List[Union[str, bytes]], fallback_content: str = None) -> bool:
+        """Escribe líneas separadas por salto de línea sin unirlas en un solo string (os.writev)."""
+        try:
+            chunks = []
+            for line in lines:
+                chunks.append(line if isinstance(line, bytes) else line.encode('utf-8'))
+                chunks.append(b"\n")
+            if chunks:
+                chunks.pop()  # Igual que "\n".join: sin salto final
+            
+            if not hasattr(os, 'writev'):
+                with open(file_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                    f.writelines(chunks)
+            else:
+                fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    for start in range(0, len(chunks), _IOV_MAX):
+                        batch = chunks[start:start + _IOV_MAX]
+                        written = os.writev(fd, batch)
+                        expected = sum(map(len, batch))
+                        if written < expected:
+                            # Escritura parcial: completar el resto del lote
+                            rest = memoryview(b"".join(batch))
+                            while written < expected:
+                                written += os.write(fd, rest[written:])
+                finally:
+                    os.close(fd)
+            logger.debug(f"Archivo guardado: {file_path.name}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error escribiendo {file_path.name}: {e}")
+            if fallback_content:
+                return self._safe_write_file(file_path, fallback_content)
+            return False
+    
     def _safe_write_json(self, file_path: Path, data: Dict[str, Any]) -> bool:
         """Escritura segura de JSON - ELIMINA duplicación de JSON."""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            payload = dumps_bytes(data, indent=True)
+            with open(file_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(payload)
             logger.debug(f"JSON guardado: {file_path.name}")
             return True
             
@@ -68,7 +170,7 @@ class ResultManager:
             fallback_data = {"error": str(e), "content": "Error de procesamiento"}
             try:
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(fallback_data, f, indent=2)
+                    f.write(json.dumps(fallback_data, indent=2, ensure_ascii=False, default=str))
                 logger.warning(f"JSON fallback guardado para {file_path.name}")
                 return True
             except Exception as e2:
@@ -86,41 +188,101 @@ class ResultManager:
         return getattr(document, attr_name, default_value)
     
     def _count_files_by_type(self, file_types: List[str]) -> Dict[str, int]:
-        """Contar archivos por tipo - ELIMINA duplicación de conteo."""
+        """
+        Contar archivos por tipo - un solo recorrido con os.scandir.
+        
+        El resultado se reutiliza mientras no cambie la fecha de modificación
+        del directorio de resultados ni la de sus subcarpetas.
+        """
         try:
-            counts = {}
-            for file_type in file_types:
-                extension = self.file_extensions.get(file_type, f'.{file_type}')
-                pattern = f"*{extension}"
-                counts[f"{file_type}_files"] = len(list(self.results_dir.rglob(pattern)))
-            return counts
+            key = (tuple(file_types), self._results_tree_mtime())
+            if self._counts_cache is not None and self._counts_cache[0] == key:
+                return dict(self._counts_cache[1])
+            
+            # extensión -> clave del conteo
+            buckets = {
+                self.file_extensions.get(file_type, f'.{file_type}'): f"{file_type}_files"
+                for file_type in file_types
+            }
+            counts = dict.fromkeys(buckets.values(), 0)
+            
+            pending = [os.fspath(self.results_dir)]
+            while pending:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                            continue
+                        name = entry.name
+                        dot = name.rfind('.')
+                        if dot != -1:
+                            bucket = buckets.get(name[dot:])
+                            if bucket is not None:
+                                counts[bucket] += 1
+            
+            self._counts_cache = (key, counts)
+            return dict(counts)
         except Exception as e:
             logger.warning(f"Error contando archivos: {e}")
             return {f"{ft}_files": 0 for ft in file_types}
     
+    def _results_tree_mtime(self) -> int:
+        """Máxima fecha de modificación (ns) del directorio de resultados y sus subcarpetas."""
+        latest = os.stat(self.results_dir).st_mtime_ns
+        with os.scandir(self.results_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    latest = max(latest, entry.stat(follow_symlinks=False).st_mtime_ns)
+        return latest
+    
     
     # ========== MÉTODOS PRINCIPALES REFACTORIZADOS ==========
     
-    def save_document(self, document: Document) -> Tuple[bool, str]:
-        """Guarda documento sin duplicaciones."""
+    def save_document(self, document: Document, folder_name: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        Guarda documento sin duplicaciones.
+        
+        folder_name permite usar una carpeta ya reservada con reserve_folder_name.
+        """
         try:
-            folder_name = self._generate_folder_name(document.filename)
+            if folder_name is None:
+                folder_name = self._generate_folder_name(document.filename)
+            # La carpeta se crea al escribir el primer archivo con contenido
             output_dir = self.results_dir / folder_name
-            output_dir.mkdir(exist_ok=True)
             
             base_name = Path(document.filename).stem
             
-            # Guardar archivos usando métodos auxiliares
+            # Codificar el texto una sola vez antes de repartir: .txt y .md
+            # reutilizan los mismos bytes (si no, ambos hilos podrían codificarlo)
+            document.content_utf8
+            
+            # Guardar archivos usando métodos auxiliares: son escrituras independientes,
+            # se lanzan en paralelo (open/write liberan el GIL)
+            savers = {
+                'txt': self._save_text_file_safe,
+                'json': self._save_json_file_safe,
+                'md': self._save_markdown_file_safe,
+            }
+            futures = {}
             results = {}
-            results['txt'] = self._save_text_file_safe(document, output_dir, base_name)
-            results['json'] = self._save_json_file_safe(document, output_dir, base_name)
-            results['md'] = self._save_markdown_file_safe(document, output_dir, base_name)
+            for file_type, saver in savers.items():
+                try:
+                    futures[self._io_pool.submit(saver, document, output_dir, base_name)] = file_type
+                except RuntimeError:
+                    # Pool cerrado (close() o apagado del intérprete): se escribe en este hilo
+                    results[file_type] = saver(document, output_dir, base_name)
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
             
-            # Verificar éxito general
-            success_count = sum(1 for success in results.values() if success)
-            total_files = len(results)
+            # Verificar éxito general (los archivos omitidos no cuentan como fallo)
+            written = [success for success in results.values() if success != SKIPPED]
+            success_count = sum(1 for success in written if success)
+            total_files = len(written)
             
-            if success_count == total_files:
+            if not written:
+                logger.info(f"Documento sin contenido, no se escribieron archivos: {folder_name}")
+                return True, folder_name
+            elif success_count == total_files:
                 logger.info(f"Documento guardado completamente: {folder_name}")
                 return True, folder_name
             elif success_count > 0:
@@ -132,131 +294,134 @@ class ResultManager:
         except Exception as e:
             return self._handle_operation_error("guardando documento", e)
     
-    def _save_text_file_safe(self, document: Document, output_dir: Path, base_name: str) -> bool:
-        """Guarda archivo de texto sin duplicaciones."""
+    def _save_text_file_safe(self, document: Document, output_dir: Path, base_name: str) -> Union[bool, str]:
+        """Guarda archivo de texto sin duplicaciones (omitido si no hay texto)."""
         try:
             txt_file = self._build_file_path(output_dir, base_name, 'txt')
             fallback = f"Error procesando contenido de {document.filename}"
-            return self._safe_write_file(txt_file, document.content, fallback)
+            lazy = LazyFile(txt_file, lambda: document.content_utf8)
+            return lazy.write(lambda path, content: self._safe_write_file(path, content, fallback))
         except Exception as e:
             logger.error(f"Error en _save_text_file_safe: {e}")
             return False
     
-    def _save_json_file_safe(self, document: Document, output_dir: Path, base_name: str) -> bool:
-        """Guarda archivo JSON sin duplicaciones."""
+    def _save_json_file_safe(self, document: Document, output_dir: Path, base_name: str) -> Union[bool, str]:
+        """Guarda archivo JSON sin duplicaciones (omitido si no hay texto ni tablas)."""
         try:
             json_file = self._build_file_path(output_dir, base_name, 'json')
+            txt_file = self._build_file_path(output_dir, base_name, 'txt')
             
-            # USAR método centralizado del documento
-            json_data = {
-                "metadata": document.get_metadata_only(),  # Sin contenido
-                "content": {
-                    "full_text": document.content,
-                    "tables": document.tables
-                },
-                "processing_info": {
-                    "timestamp": document._safe_timestamp(),
-                    "processor_version": "refactored_v2.0"
+            def build_json_data() -> Optional[Dict[str, Any]]:
+                if not document.content and not document.tables:
+                    return None
+                # USAR método centralizado del documento
+                return {
+                    "metadata": document.get_metadata_only(),  # Sin contenido
+                    "content": {
+                        "full_text": document.content,
+                        # Referencia adicional al .txt con el mismo texto
+                        "text_file": txt_file.name if document.content else None,
+                        "tables": document.tables
+                    },
+                    "processing_info": {
+                        "timestamp": document._safe_timestamp(),
+                        "processor_version": "refactored_v2.0"
+                    }
                 }
-            }
             
-            return self._safe_write_json(json_file, json_data)
+            return LazyFile(json_file, build_json_data).write(self._safe_write_json)
             
         except Exception as e:
             logger.error(f"Error en _save_json_file_safe: {e}")
             return False
     
-    def _save_markdown_file_safe(self, document: Document, output_dir: Path, base_name: str) -> bool:
-        """Guarda archivo Markdown sin duplicaciones."""
+    def _save_markdown_file_safe(self, document: Document, output_dir: Path, base_name: str) -> Union[bool, str]:
+        """Guarda archivo Markdown sin duplicaciones (omitido si solo tendría la cabecera)."""
         try:
             md_file = self._build_file_path(output_dir, base_name, 'md')
             
-            # Construir contenido Markdown
-            md_content = self._build_markdown_content(document)
+            # Un documento correcto sin texto ni tablas solo generaría la cabecera;
+            # los fallidos sí se escriben para conservar el error
+            def build_md_content() -> List[Union[str, bytes]]:
+                if document.success and not document.content and not document.tables:
+                    return []
+                return self._build_markdown_lines(document)
             
             # Fallback básico
             fallback = f"# {document.filename}\n\nError generando contenido Markdown"
             
-            return self._safe_write_file(md_file, md_content, fallback)
+            return LazyFile(md_file, build_md_content).write(
+                lambda path, lines: self._safe_writev_file(path, lines, fallback)
+            )
             
         except Exception as e:
             logger.error(f"Error en _save_markdown_file_safe: {e}")
             return False
     
-    def _build_markdown_content(self, document: Document) -> str:
-        """Construir contenido Markdown usando datos centralizados."""
+    def _build_markdown_lines(self, document: Document) -> List[Union[str, bytes]]:
+        """Construir líneas Markdown usando datos centralizados (el texto va ya en UTF-8)."""
         try:
+            # Atributos leídos una sola vez
+            try:
+                pages, word_count, character_count, tables, method, success, content, created_at = _MD_ATTRS(document)
+            except AttributeError:
+                pages = word_count = character_count = 0
+                tables, method, success, content, created_at = (), 'unknown', False, "", None
+            tables = tables or ()
+            
             # Header del documento
-            md_lines = [
-                f"# {document.filename}",
-                "",
-                "## Información del Documento",
-            ]
+            md_lines = [f"# {document.filename}", "", "## Información del Documento"]
             
-            #  CORRECCIÓN: Usar métodos de Document directamente
             try:
-                # Usar atributos directos del Document
-                md_lines.extend([
-                    f"**Páginas:** {getattr(document, 'page_count', 0)}",
-                    f"**Palabras:** {getattr(document, 'word_count', 0):,}",
-                    f"**Caracteres:** {getattr(document, 'character_count', 0):,}",
-                    f"**Tablas:** {len(getattr(document, 'tables', []))}",
-                    f"**Método:** {getattr(document, 'processing_method', 'unknown')}",
-                    f"**Éxito:** {' Sí' if getattr(document, 'success', False) else '❌ No'}",
+                md_lines += (
+                    f"**Páginas:** {pages}",
+                    f"**Palabras:** {word_count:,}",
+                    f"**Caracteres:** {character_count:,}",
+                    f"**Tablas:** {len(tables)}",
+                    f"**Método:** {method}",
+                    f"**Éxito:** {' Sí' if success else '❌ No'}",
                     ""
-                ])
+                )
                 
                 # Agregar timestamp si existe
-                if hasattr(document, 'created_at') and document.created_at:
-                    md_lines.append(f"**Fecha:** {document.created_at}")
-                    md_lines.append("")
+                if created_at:
+                    md_lines += (f"**Fecha:** {created_at}", "")
                     
             except Exception as e:
                 logger.warning(f"Error obteniendo metadatos: {e}")
-                md_lines.extend([
-                    f"**Estado:** Error obteniendo metadatos",
-                    ""
-                ])
+                md_lines += ("**Estado:** Error obteniendo metadatos", "")
             
             # Contenido principal
-            if document.success and document.content:
-                md_lines.extend([
-                    "## Contenido Extraído",
-                    "",
-                    document.content,
-                    ""
-                ])
+            if success and content:
+                md_lines += ("## Contenido Extraído", "", document.content_utf8, "")
                 
-                # Agregar tablas si existen
-                if hasattr(document, 'tables') and document.tables:
-                    md_lines.append("## Tablas Detectadas")
-                    md_lines.append("")
-                    
-                    for i, table in enumerate(document.tables, 1):
-                        md_lines.append(f"### Tabla {i}")
-                        if isinstance(table, dict) and 'content' in table:
-                            md_lines.append(str(table['content']))
-                        else:
-                            md_lines.append(str(table))
-                        md_lines.append("")
+                # Agregar tablas si existen (cada tabla como un solo bloque)
+                if tables:
+                    md_lines += ("## Tablas Detectadas", "")
+                    md_lines += [
+                        f"### Tabla {i}\n"
+                        f"{table['content'] if isinstance(table, dict) and 'content' in table else table}\n"
+                        for i, table in enumerate(tables, 1)
+                    ]
             else:
                 # Error o contenido vacío
-                md_lines.extend([
+                md_lines += (
                     "## Estado del Procesamiento",
                     "",
-                    f"**Estado:** {'Error en procesamiento' if not document.success else 'Sin contenido extraído'}",
-                ])
+                    f"**Estado:** {'Error en procesamiento' if not success else 'Sin contenido extraído'}",
+                )
                 
-                if hasattr(document, 'error') and document.error:
-                    md_lines.append(f"**Error:** {document.error}")
+                error = getattr(document, 'error', None)
+                if error:
+                    md_lines.append(f"**Error:** {error}")
                 
                 md_lines.append("")
             
-            return "\n".join(md_lines)
+            return md_lines
             
         except Exception as e:
             logger.error(f"Error construyendo Markdown: {e}")
-            return f"# {getattr(document, 'filename', 'Error')}\n\nError construyendo contenido: {e}"
+            return [f"# {getattr(document, 'filename', 'Error')}", "", f"Error construyendo contenido: {e}"]
     
     def get_summary(self) -> Dict[str, Any]:
         """Obtiene resumen sin duplicaciones."""
@@ -302,10 +467,8 @@ class ResultManager:
     def _count_tables_in_content(self, content: str) -> int:
         """Cuenta tablas reales en el contenido."""
         try:
-            import re
-            # Contar patrones de tabla más precisos
-            table_headers = re.findall(r'\*\*Tabla \d+', content)
-            return len(table_headers)
+            # Contar patrones de tabla más precisos (sin construir la lista de coincidencias)
+            return sum(1 for _ in _TABLE_RE.finditer(content))
         except Exception:
             return 0
     
@@ -321,25 +484,29 @@ class ResultManager:
         }
         return method_names.get(method, method.title())
     
+    def reserve_folder_name(self, filename: str) -> str:
+        """Reserva el nombre de carpeta de un documento antes de guardarlo."""
+        return self._generate_folder_name(filename)
+    
     def _generate_folder_name(self, filename: str) -> str:
-        """Genera nombre de carpeta numerada - SIN CAMBIOS."""
-        existing_dirs = [d for d in self.results_dir.iterdir() if d.is_dir()]
-        next_num = 1
-        
-        if existing_dirs:
-            nums = []
-            for d in existing_dirs:
-                name = d.name
-                if '_' in name:
-                    prefix = name.split('_')[0]
-                    if prefix.isdigit():
-                        nums.append(int(prefix))
-            
-            if nums:
-                next_num = max(nums) + 1
+        """Genera nombre de carpeta numerada (contador en memoria, sin listar el directorio)."""
+        with self._folder_lock:
+            next_num = self._next_folder_num
+            self._next_folder_num += 1
         
         base_name = Path(filename).stem
         return f"{next_num:02d}_{base_name}"
+    
+    def _scan_next_folder_num(self) -> int:
+        """Siguiente número de carpeta según las carpetas numeradas existentes."""
+        nums = []
+        for d in self.results_dir.iterdir():
+            name = d.name
+            if '_' in name and d.is_dir():
+                prefix = name.split('_')[0]
+                if prefix.isdigit():
+                    nums.append(int(prefix))
+        return max(nums, default=0) + 1
 # Auto-generated comment - 20:13:37
 
 # Auto-generated comment - 20:13:37
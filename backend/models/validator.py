@@ -1,19 +1,41 @@
 """
 Validador de documentos unificado - SIN duplicaciones.
 """
+import importlib.util
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, List, Dict, Any
 
+from utils.cache import ttl_cache
+
 logger = logging.getLogger(__name__)
 
+
+@ttl_cache(ttl=60)
+def _module_available(module: str) -> bool:
+    """Indica si el módulo es importable (find_spec); cacheado 60 s."""
+    try:
+        available = importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        available = False
+    if available:
+        logger.debug(f"Módulo {module}: ✓")
+    else:
+        logger.warning(f"Módulo {module}: ✗")
+    return available
+
+
 class DocumentValidator:
     """Validador unificado de documentos - ABSORBE common_validators."""
     
     # Configuración centralizada
     MAX_FILE_SIZE_MB = 50
     MIN_FILE_SIZE_KB = 1
-    ALLOWED_EXTENSIONS = {'.pdf'}
+    ALLOWED_EXTENSIONS = frozenset({'.pdf'})
+    EXTENSION_ERROR = f"Extensión no permitida. Permitidas: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
     
     @staticmethod
     def validate_pdf(file_path: Path, strict: bool = True) -> Tuple[bool, List[str]]:
@@ -29,28 +51,40 @@ class DocumentValidator:
         """
         errors = []
         
-        # Validación básica: existencia
-        if not file_path.exists():
+        # Validación básica: existencia (un solo stat, reutilizado para el tamaño)
+        try:
+            size_bytes = os.stat(file_path).st_size
+        except FileNotFoundError:
             errors.append("El archivo no existe")
             return False, errors
+        except OSError as e:
+            size_bytes = None
+            size_error = e
         
-        # Validación básica: extensión
-        if file_path.suffix.lower() not in DocumentValidator.ALLOWED_EXTENSIONS:
-            errors.append(f"Extensión no permitida. Permitidas: {DocumentValidator.ALLOWED_EXTENSIONS}")
+        # Validación básica: extensión (sin tocar el disco)
+        # El caso habitual ('.pdf') no necesita lower()
+        suffix = file_path.suffix
+        allowed = DocumentValidator.ALLOWED_EXTENSIONS
+        if suffix not in allowed and suffix.lower() not in allowed:
+            errors.append(DocumentValidator.EXTENSION_ERROR)
         
         # Validación básica: header PDF
         try:
-            with open(file_path, 'rb') as f:
-                header = f.read(5)
-                if not header.startswith(b'%PDF-'):
-                    errors.append("No es un archivo PDF válido")
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                header = os.read(fd, 5)
+            finally:
+                os.close(fd)
+            if not header.startswith(b'%PDF-'):
+                errors.append("No es un archivo PDF válido")
         except Exception as e:
             errors.append(f"Error leyendo archivo: {e}")
         
         # Validaciones de tamaño (solo si strict=True)
         if strict:
-            try:
-                size_bytes = file_path.stat().st_size
+            if size_bytes is None:
+                errors.append(f"Error verificando tamaño: {size_error}")
+            else:
                 size_mb = size_bytes / (1024 * 1024)
                 size_kb = size_bytes / 1024
                 
@@ -59,9 +93,6 @@ class DocumentValidator:
                 
                 if size_mb > DocumentValidator.MAX_FILE_SIZE_MB:
                     errors.append(f"Archivo muy grande ({size_mb:.1f} MB)")
-                    
-            except Exception as e:
-                errors.append(f"Error verificando tamaño: {e}")
         
         is_valid = len(errors) == 0
         if is_valid:
@@ -77,20 +108,18 @@ class DocumentValidator:
         return DocumentValidator.validate_pdf(file_path, strict=False)
     
     @staticmethod
-    def check_dependencies(modules: List[str]) -> Dict[str, bool]:
-        """Verificar dependencias - MIGRADO desde common_validators."""
-        dependencies = {}
-        for module in modules:
-            try:
-                __import__(module)
-                dependencies[module] = True
-                logger.debug(f"Módulo {module}: ✓")
-            except ImportError:
-                dependencies[module] = False
-                logger.warning(f"Módulo {module}: ✗")
-        return dependencies
+    def check_dependencies(modules: List[str], refresh: bool = False) -> Dict[str, bool]:
+        """
+        Verificar dependencias - MIGRADO desde common_validators.
+        
+        Usa find_spec: indica si el módulo es importable sin ejecutar su código
+        (evita cargar pandas/cv2 solo para comprobarlos). El resultado de cada
+        módulo se cachea 60 s; refresh=True vuelve a comprobarlos.
+        """
+        return {module: _module_available(module, refresh=refresh) for module in modules}
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_system_paths() -> Dict[str, Path]:
         """Paths del sistema - MIGRADO desde common_validators."""
         base_path = Path("/app" if Path("/app").exists() else ".")
@@ -101,17 +130,30 @@ class DocumentValidator:
             "config": base_path / "backend" / "utils" / "config"
         }
     
+    @staticmethod
+    def _validate_pdf_safe(file_path: Path, strict: bool) -> Tuple[bool, List[str]]:
+        """Valida un PDF convirtiendo excepciones en un resultado de error."""
+        try:
+            return DocumentValidator.validate_pdf(file_path, strict)
+        except Exception as e:
+            logger.error(f"Error validando {file_path}: {e}")
+            return False, [f"Error de validación: {e}"]
+    
     @staticmethod
     def validate_multiple_pdfs(file_paths: List[Path], strict: bool = True) -> Dict[Path, Tuple[bool, List[str]]]:
-        """Valida múltiples PDFs."""
-        results = {}
-        for file_path in file_paths:
-            try:
-                results[file_path] = DocumentValidator.validate_pdf(file_path, strict)
-            except Exception as e:
-                logger.error(f"Error validando {file_path}: {e}")
-                results[file_path] = (False, [f"Error de validación: {e}"])
-        return results
+        """Valida múltiples PDFs (en paralelo: cada validación es E/S pura)."""
+        if len(file_paths) < 2:
+            return {
+                file_path: DocumentValidator._validate_pdf_safe(file_path, strict)
+                for file_path in file_paths
+            }
+        
+        with ThreadPoolExecutor(max_workers=min(32, len(file_paths))) as executor:
+            validations = executor.map(
+                lambda file_path: DocumentValidator._validate_pdf_safe(file_path, strict),
+                file_paths
+            )
+            return dict(zip(file_paths, validations))
 
 # Alias para compatibilidad
 CommonValidators = DocumentValidator
@@ -0,0 +1,28 @@
+"""
+Prueba de ida y vuelta del vocabulario exportado (.vocab).
+
+Ejecutar desde backend/: python -m unittest discover tests
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.dynamic_dictionary_manager import _write_vocab_file, get_manager
+
+
+class VocabFileRoundTripTest(unittest.TestCase):
+    """El .vocab con codificación por prefijo devuelve las mismas palabras."""
+
+    def test_round_trip_with_control_characters(self):
+        words = {
+            "casa", "casado", "casas", "cas\tilla", "cas\nero", "cas\r",
+            "barra\\n", "barra\\", "zeta",
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            vocab_path = Path(tmp) / "export.vocab"
+            _write_vocab_file(vocab_path, words, "token")
+            self.assertEqual(get_manager().load_exported_vocabulary(vocab_path), words)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Utilidades de caché en memoria para resultados costosos de obtener.
+"""
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+
+def _freeze(value: Any) -> Any:
+    """Convierte listas/dicts en estructuras hashables para usarlas como clave."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def ttl_cache(ttl: float = 60.0) -> Callable:
+    """
+    Memoiza el resultado de una función durante `ttl` segundos.
+
+    La función decorada acepta además `refresh=True` para forzar el recálculo,
+    y expone `cache_clear()` para invalidar todo el caché.
+
+    Args:
+        ttl: Tiempo de vida de cada entrada en segundos (reloj monotónico)
+    """
+    def decorator(func: Callable) -> Callable:
+        entries: Dict[Tuple, Tuple[Any, float]] = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, refresh: bool = False, **kwargs):
+            key = (_freeze(args), _freeze(kwargs))
+            now = time.monotonic()
+
+            if not refresh:
+                with lock:
+                    cached = entries.get(key)
+                if cached is not None and cached[1] > now:
+                    return cached[0]
+
+            value = func(*args, **kwargs)
+            with lock:
+                entries[key] = (value, now + ttl)
+            return value
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
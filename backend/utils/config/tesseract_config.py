@@ -3,18 +3,57 @@ Configuración de Tesseract optimizada para documentos escaneados.
 """
 import os
 import logging
+import shlex
+from enum import Enum
+from typing import Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+_ENHANCED_CONFIG = '--oem 3 --psm 4 -c tessedit_char_blacklist=""'
+_BEST_QUALITY_CONFIG = '--oem 1 --psm 4 -c tessedit_char_blacklist=""'
+_FAST_CONFIG = '--oem 3 --psm 6'
+
 class TesseractConfig:
     """Configuración optimizada de Tesseract para documentos escaneados."""
     
+    # Configuraciones OCR por tipo (constantes, se comparten entre llamadas)
+    _CONFIGS = {
+        'default': '--oem 3 --psm 6',
+        # CAMBIO: Remover whitelist restrictiva temporalmente
+        'document': '--oem 3 --psm 6',
+        'table': '--oem 3 --psm 6 -c preserve_interword_spaces=1',
+        # NUEVAS configuraciones para documentos problemáticos
+        'high_quality': '--oem 3 --psm 4',  # Una columna uniforme
+        'aggressive': '--oem 3 --psm 3',    # Automático completo
+        'single_block': '--oem 3 --psm 6',  # Bloque uniforme
+        # Para debugging - sin restricciones
+        'debug': '--oem 3 --psm 6 -c tessedit_char_blacklist=""',
+        # Configuraciones adicionales para casos específicos
+        'single_line': '--oem 3 --psm 7',   # Línea de texto única
+        'single_word': '--oem 3 --psm 8',   # Palabra única
+        'sparse_text': '--oem 3 --psm 11',  # Texto disperso
+        'vertical_text': '--oem 3 --psm 5', # Bloque vertical
+        # Configuraciones con parámetros adicionales
+        'no_dict': '--oem 3 --psm 6 -c load_system_dawg=0 -c load_freq_dawg=0',
+        'preserve_spaces': '--oem 3 --psm 6 -c preserve_interword_spaces=1',
+        'numeric_only': '--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789.,',
+        'alpha_only': '--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyzáéíóúñÁÉÍÓÚÑ '
+    }
+    
     def __init__(self):
         self.tesseract_cmd = os.getenv("TESSERACT_CMD", "/usr/bin/tesseract")
         self.DEFAULT_DPI = 300
         # CAMBIO CRÍTICO: Agregar español como idioma principal
         self.default_language = "spa+eng"  # Español + Inglés
         
+        # Todas las configuraciones, calculadas una sola vez
+        self._all_configs = {
+            **self._CONFIGS,
+            'enhanced': _ENHANCED_CONFIG,
+            'best_quality': _BEST_QUALITY_CONFIG,
+            'fast': _FAST_CONFIG
+        }
+        
         logger.info(f"Tesseract configurado: {self.tesseract_cmd}, idioma: {self.default_language}")
     
     def get_tesseract_cmd(self) -> str:
@@ -27,48 +66,31 @@ class TesseractConfig:
     
     def get_ocr_config(self, config_type: str = 'default') -> str:
         """Obtener configuración OCR optimizada."""
-        configs = {
-            'default': '--oem 3 --psm 6',
-            # CAMBIO: Remover whitelist restrictiva temporalmente
-            'document': '--oem 3 --psm 6',
-            'table': '--oem 3 --psm 6 -c preserve_interword_spaces=1',
-            # NUEVAS configuraciones para documentos problemáticos
-            'high_quality': '--oem 3 --psm 4',  # Una columna uniforme
-            'aggressive': '--oem 3 --psm 3',    # Automático completo
-            'single_block': '--oem 3 --psm 6',  # Bloque uniforme
-            # Para debugging - sin restricciones
-            'debug': '--oem 3 --psm 6 -c tessedit_char_blacklist=""',
-            # Configuraciones adicionales para casos específicos
-            'single_line': '--oem 3 --psm 7',   # Línea de texto única
-            'single_word': '--oem 3 --psm 8',   # Palabra única
-            'sparse_text': '--oem 3 --psm 11',  # Texto disperso
-            'vertical_text': '--oem 3 --psm 5', # Bloque vertical
-            # Configuraciones con parámetros adicionales
-            'no_dict': '--oem 3 --psm 6 -c load_system_dawg=0 -c load_freq_dawg=0',
-            'preserve_spaces': '--oem 3 --psm 6 -c preserve_interword_spaces=1',
-            'numeric_only': '--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789.,',
-            'alpha_only': '--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyzáéíóúñÁÉÍÓÚÑ '
-        }
-        
-        config = configs.get(config_type, configs['default'])
-        logger.debug(f"Configuración OCR '{config_type}': {config}")
+        config = self._CONFIGS.get(config_type, self._CONFIGS['default'])
+        logger.debug("Configuración OCR '%s': %s", config_type, config)
         return config
     
+    def get_ocr_argv(self, profile: Union['OcrProfile', str] = 'default') -> Tuple[str, ...]:
+        """Configuración OCR ya separada en argumentos (para argv de subprocess)."""
+        if isinstance(profile, OcrProfile):
+            return profile.value
+        return OcrProfile.__members__.get(profile.upper(), OcrProfile.DEFAULT).value
+    
     def get_image_dpi(self) -> int:
         """Obtener DPI para conversión de imágenes."""
         return self.DEFAULT_DPI
     
     def get_enhanced_config(self) -> str:
         """Configuración especial para documentos escaneados mejorados."""
-        return '--oem 3 --psm 4 -c tessedit_char_blacklist=""'
+        return _ENHANCED_CONFIG
     
     def get_best_quality_config(self) -> str:
         """Configuración para máxima calidad (más lenta)."""
-        return '--oem 1 --psm 4 -c tessedit_char_blacklist=""'
+        return _BEST_QUALITY_CONFIG
     
     def get_fast_config(self) -> str:
         """Configuración rápida para pruebas."""
-        return '--oem 3 --psm 6'
+        return _FAST_CONFIG
     
     def get_custom_config(self, psm: int = 6, oem: int = 3, whitelist: str = None, 
                          blacklist: str = None, preserve_spaces: bool = False) -> str:
@@ -135,26 +157,14 @@ class TesseractConfig:
     
     def get_all_configs(self) -> dict:
         """Obtener todas las configuraciones disponibles."""
-        return {
-            'default': self.get_ocr_config('default'),
-            'document': self.get_ocr_config('document'),
-            'table': self.get_ocr_config('table'),
-            'high_quality': self.get_ocr_config('high_quality'),
-            'aggressive': self.get_ocr_config('aggressive'),
-            'single_block': self.get_ocr_config('single_block'),
-            'debug': self.get_ocr_config('debug'),
-            'single_line': self.get_ocr_config('single_line'),
-            'single_word': self.get_ocr_config('single_word'),
-            'sparse_text': self.get_ocr_config('sparse_text'),
-            'vertical_text': self.get_ocr_config('vertical_text'),
-            'no_dict': self.get_ocr_config('no_dict'),
-            'preserve_spaces': self.get_ocr_config('preserve_spaces'),
-            'numeric_only': self.get_ocr_config('numeric_only'),
-            'alpha_only': self.get_ocr_config('alpha_only'),
-            'enhanced': self.get_enhanced_config(),
-            'best_quality': self.get_best_quality_config(),
-            'fast': self.get_fast_config()
-        }
+        return dict(self._all_configs)
+
+# Perfiles OCR con los argumentos ya separados (se tokeniza una sola vez);
+# los perfiles con la misma configuración quedan como alias
+OcrProfile = Enum('OcrProfile', {
+    name.upper(): tuple(shlex.split(config))
+    for name, config in TesseractConfig._CONFIGS.items()
+})
 
 # Instancia global para uso directo
 tesseract_config = TesseractConfig()
@@ -1,15 +1,22 @@
 """
 Diccionario dinámico simplificado.
 """
-import json
 import logging
+import os
+import time
+import uuid
 from pathlib import Path
-from typing import Dict, Set
+from typing import Dict, Iterable, Mapping, Set, Tuple
 from collections import Counter
 from datetime import datetime
 
+from utils.fast_json import dumps_bytes, loads
+
 logger = logging.getLogger(__name__)
 
+# Vigencia de las estadísticas cacheadas (segundos)
+_STATS_TTL = 0.05
+
 class DynamicDictionary:
     """Diccionario dinámico básico."""
     
@@ -20,6 +27,21 @@ class DynamicDictionary:
         self.corrections = {}
         self.valid_words = set()
         self.word_frequency = Counter()
+        self.error_patterns = {}
+        self.correction_confidence = {}
+        
+        # Versión del vocabulario: cambia con cada palabra nueva (exportación incremental)
+        self._vocab_instance = uuid.uuid4().hex
+        self._vocab_version = 0
+        
+        # Contador de modificaciones (invalida cachés derivadas, p. ej. reportes)
+        self._version = 0
+        
+        # Estadísticas cacheadas: (instante monotonic, versión, estadísticas)
+        self._stats_cache = None
+        
+        # Versión del último estado guardado o cargado (evita reescribir sin cambios)
+        self._last_saved_version = None
         
         self._load_dictionary()
         logger.info(f"DynamicDictionary inicializado: {len(self.corrections)} correcciones")
@@ -28,28 +50,97 @@ class DynamicDictionary:
         """Carga diccionario desde archivo."""
         try:
             if self.dictionary_path.exists():
-                with open(self.dictionary_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = loads(self.dictionary_path.read_bytes())
                 self.corrections = data.get('corrections', {})
                 self.valid_words = set(data.get('valid_words', []))
-                self.word_frequency = Counter(data.get('word_frequency', {}))
+                self._vocab_version += 1
+                self._version += 1
+                # Sobre un Counter vacío, update con un dict es una mezcla de dict en C
+                self.word_frequency = Counter()
+                word_frequency = data.get('word_frequency')
+                if word_frequency:
+                    self.word_frequency.update(word_frequency)
+                self.error_patterns = data.get('error_patterns', {})
+                self.correction_confidence = data.get('correction_confidence', {})
+                self._last_saved_version = self._version
         except Exception as e:
             logger.warning(f"Error cargando diccionario: {e}")
     
     def save_dictionary(self):
-        """Guarda diccionario."""
+        """Guarda diccionario (escritura atómica; se omite si no hubo cambios)."""
         try:
-            data = {
+            version = self._version
+            if version == self._last_saved_version:
+                logger.debug("Diccionario sin cambios, no se guarda")
+                return
+            
+            # Serializar compacto (orjson si está disponible) y escribir de una vez:
+            # el contador de frecuencias ocupa la mitad sin indentación
+            payload = dumps_bytes({
                 'corrections': self.corrections,
-                'valid_words': list(self.valid_words),
+                'valid_words': self.valid_words,  # el serializador lo emite como lista
                 'word_frequency': dict(self.word_frequency),
+                'error_patterns': self.error_patterns,
+                'correction_confidence': self.correction_confidence,
                 'updated': datetime.now().isoformat()
-            }
-            with open(self.dictionary_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            }, compact=True)
+            
+            # Archivo temporal en el mismo directorio + os.replace: nunca queda a medias
+            tmp_path = self.dictionary_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.dictionary_path)
+            self._last_saved_version = version
         except Exception as e:
             logger.error(f"Error guardando diccionario: {e}")
     
+    def mark_changed(self):
+        """Registra una modificación hecha directamente sobre los contenedores."""
+        self._version += 1
+    
+    @property
+    def vocab_token(self) -> str:
+        """Identificador de la versión actual del vocabulario."""
+        return f"{self._vocab_instance}-{self._vocab_version}"
+    
+    def add_valid_words(self, words: Iterable[str]) -> int:
+        """Agrega palabras válidas; devuelve cuántas eran nuevas."""
+        before = len(self.valid_words)
+        self.valid_words.update(words)
+        added = len(self.valid_words) - before
+        if added:
+            self._vocab_version += 1
+            self._version += 1
+        return added
+    
+    def add_manual_correction(self, error: str, correction: str, confidence: float = 1.0):
+        """Agrega una corrección manual (en memoria; persiste con save_dictionary)."""
+        self.add_manual_corrections(((error, correction),), confidence)
+    
+    def add_manual_corrections(self, pairs: Iterable[Tuple[str, str]], confidence: float = 1.0) -> int:
+        """
+        Agrega correcciones manuales en bloque con una sola actualización.
+        
+        Devuelve el número de correcciones recibidas.
+        """
+        new_corrections = dict(pairs)
+        self.corrections.update(new_corrections)
+        self.correction_confidence.update(dict.fromkeys(new_corrections, confidence))
+        self._version += 1
+        return len(new_corrections)
+    
+    def add_manual_corrections_bulk(self, mapping: Mapping[str, str], confidence: float = 1.0) -> int:
+        """
+        Agrega un diccionario completo de correcciones y guarda una sola vez.
+        
+        Devuelve el número de correcciones agregadas.
+        """
+        self.corrections.update(mapping)
+        self.correction_confidence.update(dict.fromkeys(mapping, confidence))
+        self._version += 1
+        self.save_dictionary()
+        return len(mapping)
+    
     def correct_text(self, text: str, document_name: str = "unknown") -> str:
         """Corrige texto usando diccionario."""
         # Por ahora solo retorna el texto original
@@ -60,13 +151,29 @@ class DynamicDictionary:
         """Aprende de texto."""
         return {'new_words': 0, 'new_corrections': 0}
     
+    def learn_from_chunks(self, chunks: Iterable[str], document_name: str = "unknown") -> Dict[str, int]:
+        """Aprende de un texto entregado por partes; suma las estadísticas."""
+        totals = Counter()
+        for chunk in chunks:
+            totals.update(self.learn_from_text(chunk, document_name))
+        return dict(totals)
+    
     def get_statistics(self) -> Dict[str, any]:
-        """Estadísticas básicas."""
-        return {
+        """Estadísticas básicas (reutilizadas 50 ms si el diccionario no cambió)."""
+        now = time.monotonic()
+        # word_frequency se modifica sin pasar por _version: su tamaño entra en la clave
+        key = (self._version, len(self.word_frequency))
+        cached = self._stats_cache
+        if cached is not None and cached[1] == key and now - cached[0] < _STATS_TTL:
+            return dict(cached[2])
+        
+        stats = {
             'total_corrections': len(self.corrections),
             'valid_words': len(self.valid_words),
             'vocabulary_size': len(self.word_frequency)
         }
+        self._stats_cache = (now, key, stats)
+        return dict(stats)
 
 # Instancia global
 dynamic_dictionary = DynamicDictionary()
\ No newline at end of file
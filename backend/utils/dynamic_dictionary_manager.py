@@ -2,15 +2,197 @@
 Gestor para el diccionario dinámico.
 Maneja la inicialización, exportación y reportes del diccionario.
 """
+import asyncio
+import codecs
+import functools
+import itertools
 import logging
-import json
+import mmap
+import os
+import pickle
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
 from utils.dynamic_dictionary import dynamic_dictionary
+from utils.fast_json import DECODE_ERRORS, dumps_bytes, loads
+
+try:
+    import ijson
+    _SEED_JSON_ERRORS = DECODE_ERRORS + (ijson.JSONError,)
+    try:
+        # Backend en C (yajl2) si está compilado; si no, el que ijson elija
+        ijson = ijson.get_backend('yajl2_c')
+    except Exception:
+        pass
+except ImportError:  # pragma: no cover - depende del entorno
+    ijson = None
+    _SEED_JSON_ERRORS = DECODE_ERRORS
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende del entorno
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+# Tamaño de bloque al sembrar desde texto (se ajusta al último salto de línea)
+_SEED_CHUNK_SIZE = 1 << 20
+
+
+def _iter_text_chunks(source_path: Path, chunk_size: int = _SEED_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Recorre un archivo de texto mapeado en memoria en bloques alineados a líneas.
+    
+    Omite los bloques vacíos o solo con espacios, de modo que un archivo sin
+    contenido útil no produce ningún bloque.
+    """
+    with open(source_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            start = 0
+            while start < size:
+                end = min(start + chunk_size, size)
+                if end < size:
+                    newline = mm.rfind(b'\n', start, end)
+                    if newline != -1:
+                        end = newline + 1
+                chunk = mm[start:end].decode('utf-8', errors='replace')
+                start = end
+                if chunk.strip():
+                    yield chunk
+
+def _sniff_seed_format(source_path: Path) -> str:
+    """Deduce el formato ('.json' o '.txt') por el primer byte significativo del archivo."""
+    with open(source_path, 'rb') as f:
+        head = f.read(64)
+    if head.startswith(codecs.BOM_UTF8):
+        head = head[len(codecs.BOM_UTF8):]
+    head = head.translate(None, b' \t\r\n')
+    return '.json' if head[:1] in (b'{', b'[') else '.txt'
+
+# A partir de este tamaño el JSON de siembra se parsea desde un mmap
+_SEED_MMAP_MIN_SIZE = 8 << 20
+
+
+def _load_json_file(source_path: Path):
+    """Parsea un JSON; los archivos grandes se leen mapeados en memoria, sin copiarlos."""
+    with open(source_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= _SEED_MMAP_MIN_SIZE:
+            data = f.read()
+            return loads(data[len(codecs.BOM_UTF8):] if data.startswith(codecs.BOM_UTF8) else data)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = len(codecs.BOM_UTF8) if mm[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+            with memoryview(mm) as view, view[start:] as body:
+                return loads(body)
+
+# Correcciones por lote al sembrar desde JSON en streaming
+_SEED_BATCH_SIZE = 10_000
+
+
+def _iter_json_object_items(f) -> Iterator[Tuple[str, object]]:
+    """
+    Recorre en streaming los pares clave/valor del objeto JSON raíz.
+    
+    Raises:
+        ValueError: Si la raíz no es un objeto JSON.
+    """
+    if f.read(len(codecs.BOM_UTF8)) != codecs.BOM_UTF8:
+        f.seek(0)
+    first = f.read(1)
+    while first and first.isspace():
+        first = f.read(1)
+    if first != b'{':
+        logger.error("El archivo JSON no contiene un diccionario.")
+        raise ValueError("El archivo JSON no contiene un diccionario.")
+    f.seek(-1, os.SEEK_CUR)
+    return ijson.kvitems(f, '')
+
+# Vigencia del reporte de aprendizaje cacheado (segundos)
+_REPORT_TTL = 1.0
+
+# Último timestamp formateado: (segundo epoch, ISO 8601)
+_report_ts_cache = (0, "")
+
+
+def _report_timestamp() -> str:
+    """Timestamp ISO con resolución de segundos, formateado como mucho una vez por segundo."""
+    global _report_ts_cache
+    now_s = int(time.time())
+    cached_s, cached_str = _report_ts_cache
+    if now_s != cached_s:
+        # datetime.isoformat es tan rápido como time.strftime (ambos ~1 µs) y
+        # conserva el formato; lo que ahorra es no formatear más de una vez por segundo
+        cached_str = datetime.fromtimestamp(now_s).isoformat()
+        _report_ts_cache = (now_s, cached_str)
+    return cached_str
+
+# Bloque de escritura de la exportación (pocas llamadas write grandes)
+_EXPORT_WRITE_CHUNK = 16 << 20
+
+
+def _write_bytes_atomic(path: Path, payload: bytes, chunk_size: int = _EXPORT_WRITE_CHUNK):
+    """Escribe bytes en un temporal por bloques grandes, fsync y os.replace atómico."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    view = memoryview(payload)
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        offset = 0
+        while offset < len(view):
+            offset += os.write(fd, view[offset:offset + chunk_size])
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+# "vocab2": sufijos con \\, \t, \n y \r escapados (el formato sin escapar era "vocab")
+_VOCAB_HEADER = "# vocab2 "
+_VOCAB_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+_VOCAB_UNESCAPE_RE = re.compile(r'\\(.)')
+_VOCAB_UNESCAPES = {'t': '\t', 'n': '\n', 'r': '\r'}
+
+
+def _unescape_vocab(text: str) -> str:
+    """Deshace el escapado de _VOCAB_ESCAPES."""
+    if '\\' not in text:
+        return text
+    return _VOCAB_UNESCAPE_RE.sub(lambda m: _VOCAB_UNESCAPES.get(m.group(1), m.group(1)), text)
+
+
+def _read_vocab_token(vocab_path: Path) -> Optional[str]:
+    """Versión guardada en la cabecera de un archivo .vocab (None si no existe)."""
+    try:
+        with open(vocab_path, 'r', encoding='utf-8') as f:
+            header = f.readline()
+    except OSError:
+        return None
+    if not header.startswith(_VOCAB_HEADER):
+        return None
+    return header[len(_VOCAB_HEADER):].strip()
+
+
+def _write_vocab_file(vocab_path: Path, words: Iterable[str], token: str):
+    """
+    Escribe el vocabulario ordenado con codificación por prefijo compartido.
+    
+    Cada línea es "<longitud del prefijo común con la anterior>\t<sufijo>"; el
+    sufijo va escapado para que un tabulador o salto de línea no rompa la línea.
+    """
+    tmp_path = vocab_path.with_name(vocab_path.name + '.tmp')
+    previous = ""
+    with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write(f"{_VOCAB_HEADER}{token}\n")
+        for word in sorted(words):
+            shared = len(os.path.commonprefix((previous, word)))
+            f.write(f"{shared}\t{word[shared:].translate(_VOCAB_ESCAPES)}\n")
+            previous = word
+    os.replace(tmp_path, vocab_path)
+
+
 class DynamicDictionaryManager:
     """Gestiona el diccionario dinámico."""
     
@@ -21,90 +203,312 @@ class DynamicDictionaryManager:
         para gestionar correcciones y aprendizaje automático.
         """
         self.dictionary = dynamic_dictionary
+        
+        # Reporte cacheado: (versión del diccionario, instante, reporte)
+        self._report_cache = None
+        self._report_cache_version = -1
+        self._report_cache_ts = 0.0
+        
+        # Sembrado por extensión (agregar formatos nuevos aquí)
+        self._seed_handlers = {
+            '.json': self._seed_json,
+            '.txt': self._seed_txt,
+        }
     
     def seed_from_external_source(self, source_path: Path) -> int:
         """
         Inicializar diccionario desde fuente externa (solo la primera vez).
         Args:
-            source_path (Path): Ruta al archivo de fuente externa (.json o .txt)
+            source_path (Path): Ruta al archivo de fuente externa (.json o .txt; con otra
+                extensión se detecta el formato por el contenido)
         Returns:
-            int: Número de elementos cargados exitosamente. 0 si hubo error.
+            int: Número de elementos cargados exitosamente. 0 si hubo error de E/S.
         Raises:
             FileNotFoundError: Si el archivo no existe.
             ValueError: Si el archivo no tiene el formato esperado.
         """
         if not source_path.exists():
-            logger.error(f"El archivo {source_path} no existe.")
+            logger.error("El archivo %s no existe.", source_path)
             raise FileNotFoundError(f"El archivo {source_path} no existe.")
         try:
-            if source_path.suffix.lower() == '.json':
-                with source_path.open('r', encoding='utf-8') as f:
-                    external_data = json.load(f)
-                if not isinstance(external_data, dict):
-                    logger.error("El archivo JSON no contiene un diccionario.")
-                    raise ValueError("El archivo JSON no contiene un diccionario.")
-                for error, correction in external_data.items():
-                    self.dictionary.add_manual_correction(error, correction, confidence=0.8)
-                logger.info(f"Diccionario inicializado con {len(external_data)} correcciones")
-                return len(external_data)
-            elif source_path.suffix.lower() == '.txt':
-                text = source_path.read_text(encoding='utf-8')
-                if not text.strip():
-                    logger.warning(f"El archivo {source_path} está vacío.")
-                    return 0
-                stats = self.dictionary.learn_from_text(text, f"seed_{source_path.name}")
-                logger.info(f"Diccionario inicializado aprendiendo de texto: {stats}")
-                return stats.get('new_valid_words', 0)
-            else:
-                logger.error("Formato de archivo no soportado. Solo .json o .txt")
-                raise ValueError("Formato de archivo no soportado. Solo .json o .txt")
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            logger.error(f"Error leyendo el archivo: {e}")
-            raise ValueError(f"Error leyendo el archivo: {e}")
-        except Exception as e:
-            logger.error(f"Error inicializando diccionario: {e}")
+            handler = self._seed_handlers.get(source_path.suffix.lower())
+            if handler is None:
+                # Extensión desconocida: se decide por el contenido
+                handler = self._seed_handlers[_sniff_seed_format(source_path)]
+            return handler(source_path)
+        except OSError as e:
+            logger.error("Error inicializando diccionario: %s", e)
             return 0
-    def export_learned_corrections(self, export_path: Path) -> bool:
+    
+    def seed_from_directory(self, dir_path: Path) -> int:
+        """
+        Inicializar diccionario desde todos los .json/.txt de un directorio.
+        Args:
+            dir_path (Path): Directorio con las fuentes externas
+        Returns:
+            int: Número total de elementos cargados.
+        Raises:
+            FileNotFoundError: Si el directorio no existe.
+        """
+        if not dir_path.is_dir():
+            logger.error("El directorio %s no existe.", dir_path)
+            raise FileNotFoundError(f"El directorio {dir_path} no existe.")
+        
+        sources = sorted(
+            path for path in dir_path.iterdir()
+            if path.is_file() and path.suffix.lower() in self._seed_handlers
+        )
+        json_files = [path for path in sources if path.suffix.lower() == '.json']
+        txt_files = [path for path in sources if path.suffix.lower() == '.txt']
+        
+        total = 0
+        if json_files:
+            # Lectura y parseo en paralelo; el diccionario solo se modifica en este hilo
+            workers = min(len(json_files), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for data in executor.map(self._parse_seed_json, json_files):
+                    if data:
+                        total += self.dictionary.add_manual_corrections(data.items(), confidence=0.8)
+                    del data
+            self.dictionary.save_dictionary()
+        
+        for path in txt_files:
+            total += self.seed_from_external_source(path)
+        
+        logger.info("Diccionario inicializado desde %d archivos de %s: %d elementos", len(sources), dir_path, total)
+        return total
+    
+    def _parse_seed_json(self, source_path: Path) -> Optional[Dict[str, str]]:
+        """Parsea un JSON de correcciones sin tocar el diccionario (None si es inválido)."""
+        try:
+            data = _load_json_file(source_path)
+        except _SEED_JSON_ERRORS + (UnicodeDecodeError, OSError) as e:
+            logger.error("Error leyendo el archivo %s: %s", source_path, e)
+            return None
+        if not isinstance(data, dict):
+            logger.error("El archivo JSON %s no contiene un diccionario.", source_path)
+            return None
+        return data
+    
+    def _seed_json(self, source_path: Path) -> int:
+        """Carga correcciones desde un objeto JSON {error: corrección}."""
+        if ijson is not None:
+            # En streaming: la memoria no depende del tamaño del archivo
+            loaded = 0
+            with open(source_path, 'rb') as f:
+                items = _iter_json_object_items(f)
+                try:
+                    while True:
+                        batch = list(itertools.islice(items, _SEED_BATCH_SIZE))
+                        if not batch:
+                            break
+                        loaded += self.dictionary.add_manual_corrections(batch, confidence=0.8)
+                except _SEED_JSON_ERRORS + (UnicodeDecodeError,) as e:
+                    logger.error("Error leyendo el archivo: %s", e)
+                    raise ValueError(f"Error leyendo el archivo: {e}") from e
+            self.dictionary.save_dictionary()
+            logger.info("Diccionario inicializado con %d correcciones", loaded)
+            return loaded
+        
+        try:
+            external_data = _load_json_file(source_path)
+        except DECODE_ERRORS + (UnicodeDecodeError,) as e:
+            logger.error("Error leyendo el archivo: %s", e)
+            raise ValueError(f"Error leyendo el archivo: {e}") from e
+        if not isinstance(external_data, dict):
+            logger.error("El archivo JSON no contiene un diccionario.")
+            raise ValueError("El archivo JSON no contiene un diccionario.")
+        self.dictionary.add_manual_corrections_bulk(external_data, confidence=0.8)
+        # Las correcciones ya están en el diccionario: liberar el JSON parseado
+        loaded = len(external_data)
+        del external_data
+        logger.info("Diccionario inicializado con %d correcciones", loaded)
+        return loaded
+    
+    def _seed_txt(self, source_path: Path) -> int:
+        """Aprende vocabulario de un texto plano, por bloques."""
+        chunks = _iter_text_chunks(source_path)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            logger.warning("El archivo %s está vacío.", source_path)
+            return 0
+        stats = self.dictionary.learn_from_chunks(
+            itertools.chain((first_chunk,), chunks), f"seed_{source_path.name}"
+        )
+        logger.info("Diccionario inicializado aprendiendo de texto: %s", stats)
+        return stats.get('new_valid_words', 0)
+    
+    def export_learned_corrections(self, export_path: Path, pretty: bool = False) -> bool:
         """
         Exporta correcciones aprendidas a archivo JSON.
         Args:
             export_path (Path): Ruta donde guardar las correcciones exportadas
+            pretty (bool): Si True, indenta el JSON (más lento y más grande; para depurar)
         Returns:
             bool: True si la exportación fue exitosa, False en caso contrario
         """
         try:
+            # El vocabulario va en un archivo aparte que solo se reescribe si cambió
+            vocab_path = export_path.with_suffix('.vocab')
+            vocab_token = self.dictionary.vocab_token
+            if _read_vocab_token(vocab_path) != vocab_token:
+                _write_vocab_file(vocab_path, self.dictionary.valid_words, vocab_token)
+            
             export_data = {
                 'corrections': self.dictionary.corrections,
-                'valid_words': list(self.dictionary.valid_words),
+                'valid_words_ref': vocab_path.name,
+                'valid_words_count': len(self.dictionary.valid_words),
                 'error_patterns': self.dictionary.error_patterns,
+                # Se mantiene por compatibilidad: lectores externos del JSON lo esperan
                 'statistics': self.dictionary.get_statistics(),
                 'exported_at': datetime.now().isoformat()
             }
-            export_path.write_text(json.dumps(export_data, ensure_ascii=False, indent=2), encoding='utf-8')
-            logger.info(f"Correcciones exportadas a: {export_path}")
+            _write_bytes_atomic(export_path, dumps_bytes(export_data, indent=pretty))
+            logger.info("Correcciones exportadas a: %s", export_path)
+            return True
+        except Exception as e:
+            logger.error("Error exportando: %s", e)
+            return False
+    
+    async def export_learned_corrections_async(self, export_path: Path, pretty: bool = False) -> bool:
+        """
+        Versión no bloqueante de export_learned_corrections para contextos asyncio.
+        
+        La serialización y la escritura corren en el executor por defecto del loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.export_learned_corrections, export_path, pretty)
+    
+    def export_learned_corrections_binary(self, export_path: Path) -> bool:
+        """
+        Exporta el diccionario en formato binario para recargarlo en este mismo backend.
+        
+        Usa msgpack si está instalado; si no, pickle protocolo 5. Para intercambio
+        con otras herramientas sigue usándose export_learned_corrections (JSON).
+        Args:
+            export_path (Path): Ruta donde guardar la exportación binaria
+        Returns:
+            bool: True si la exportación fue exitosa, False en caso contrario
+        """
+        try:
+            export_data = {
+                'corrections': self.dictionary.corrections,
+                'correction_confidence': self.dictionary.correction_confidence,
+                'valid_words': list(self.dictionary.valid_words),
+                'error_patterns': self.dictionary.error_patterns,
+                'exported_at': datetime.now().isoformat()
+            }
+            if msgpack is not None:
+                payload = msgpack.packb(export_data, use_bin_type=True)
+            else:
+                payload = pickle.dumps(export_data, protocol=5)
+            _write_bytes_atomic(export_path, payload)
+            logger.info("Correcciones exportadas (binario) a: %s", export_path)
             return True
         except Exception as e:
-            logger.error(f"Error exportando: {e}")
+            logger.error("Error exportando binario: %s", e)
             return False
     
-    def get_learning_report(self) -> Dict[str, object]:
+    def load_binary_export(self, export_path: Path) -> int:
+        """
+        Recarga una exportación de export_learned_corrections_binary.
+        
+        Solo debe usarse con archivos generados por este backend (pickle no es seguro
+        con datos de terceros).
+        Args:
+            export_path (Path): Ruta a la exportación binaria
+        Returns:
+            int: Número de correcciones cargadas.
+        """
+        payload = export_path.read_bytes()
+        if payload[:2] == b'\x80\x05':
+            data = pickle.loads(payload)
+        elif msgpack is not None:
+            data = msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        else:
+            raise ValueError("La exportación es msgpack y msgpack no está instalado")
+        del payload
+        
+        self.dictionary.add_valid_words(data.get('valid_words', ()))
+        self.dictionary.error_patterns.update(data.get('error_patterns', {}))
+        corrections = data.get('corrections', {})
+        confidence = data.get('correction_confidence', {})
+        self.dictionary.add_manual_corrections(corrections.items(), confidence=0.8)
+        # Se conserva la confianza original de cada corrección exportada
+        self.dictionary.correction_confidence.update(confidence)
+        self.dictionary.mark_changed()
+        self.dictionary.save_dictionary()
+        logger.info("Exportación binaria cargada: %d correcciones", len(corrections))
+        return len(corrections)
+    
+    def load_exported_vocabulary(self, vocab_path: Path) -> Set[str]:
+        """
+        Lee un vocabulario exportado (.vocab).
+        Args:
+            vocab_path (Path): Ruta al archivo .vocab referenciado por la exportación
+        Returns:
+            Set[str]: Palabras válidas exportadas
+        """
+        words = set()
+        previous = ""
+        with open(vocab_path, 'r', encoding='utf-8') as f:
+            # Cabecera con la versión; los archivos "vocab" antiguos no van escapados
+            escaped = next(f, '').startswith(_VOCAB_HEADER)
+            for line in f:
+                shared, _, suffix = line.rstrip('\n').partition('\t')
+                if escaped:
+                    suffix = _unescape_vocab(suffix)
+                previous = previous[:int(shared)] + suffix
+                words.add(previous)
+        return words
+    
+    def get_learning_report(self, verbose: bool = False) -> Dict[str, object]:
         """
         Genera reporte de aprendizaje dinámico.
+        Args:
+            verbose (bool): Si True, incluye los patrones de error completos (copia)
         Returns:
             Dict[str, object]: Diccionario con estadísticas completas del aprendizaje
         """
+        report = self._cached_report()
+        if verbose:
+            report['error_patterns'] = dict(self.dictionary.error_patterns)
+        return report
+    
+    def _cached_report(self) -> Dict[str, object]:
+        """Reporte resumido (solo conteos), reutilizado mientras no cambie el diccionario."""
+        now = time.monotonic()
+        version = self.dictionary._version
+        if (self._report_cache is not None and version == self._report_cache_version
+                and now - self._report_cache_ts < _REPORT_TTL):
+            return {**self._report_cache, 'timestamp': _report_timestamp()}
+        
         stats = self.dictionary.get_statistics()
-        return {
-            'timestamp': datetime.now().isoformat(),
+        report = {
+            'timestamp': _report_timestamp(),
             'learning_mode': 'dynamic',
             'hardcoded_words': 0,  # ¡CERO palabras hardcodeadas!
             'learned_corrections': stats.get('total_corrections', 0),
             'learned_vocabulary': stats.get('valid_words', []),
             'learning_sessions': stats.get('learning_sessions', 0),
-            'auto_detected_patterns': stats.get('error_patterns', []),
+            'auto_detected_patterns': len(self.dictionary.error_patterns),
             'last_learning_session': stats.get('last_session', None),
             'dictionary_health': 'dynamic_learning' if stats.get('total_corrections', 0) > 0 else 'learning_ready'
         }
+        self._report_cache = report
+        self._report_cache_version = version
+        self._report_cache_ts = now
+        return dict(report)
+
+# Instancia global: se crea en el primer uso
+@functools.lru_cache(maxsize=None)
+def get_manager() -> DynamicDictionaryManager:
+    """Devuelve el gestor compartido (creado la primera vez que se pide)."""
+    return DynamicDictionaryManager()
+
 
-# Instancia global
-dynamic_dictionary_manager = DynamicDictionaryManager()
\ No newline at end of file
+def __getattr__(name):
+    # Compatibilidad con `from utils.dynamic_dictionary_manager import dynamic_dictionary_manager`
+    if name == 'dynamic_dictionary_manager':
+        return get_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,69 @@
+"""
+Serialización JSON rápida con orjson y fallback a la librería estándar.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+# Sin orjson, ujson (también en C) sigue acelerando la lectura
+ujson = None
+if orjson is None:
+    try:
+        import ujson
+    except ImportError:  # pragma: no cover - depende del entorno
+        ujson = None
+
+# Errores de decodificación de cualquiera de los backends
+# (orjson.JSONDecodeError ya hereda de json.JSONDecodeError)
+DECODE_ERRORS = (json.JSONDecodeError,) + ((getattr(ujson, 'JSONDecodeError', ValueError),) if ujson else ())
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+)
+
+
+def _default(obj: Any) -> Any:
+    """Tipos no nativos de JSON: los conjuntos como listas, el resto con str()."""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps_bytes(data: Any, indent: bool = False, compact: bool = False) -> bytes:
+    """
+    Serializa a JSON en bytes UTF-8 (sin escapar caracteres no ASCII).
+
+    Args:
+        data: Objeto a serializar; los conjuntos se emiten como listas y el
+            resto de tipos no soportados se convierte con str()
+        indent: Si True, indenta con 2 espacios
+        compact: Si True, sin espacios ni indentación; sin orjson escapa a ASCII
+            para usar la ruta rápida del codificador C de la librería estándar
+    """
+    if orjson is not None:
+        options = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent and not compact else 0)
+        return orjson.dumps(data, default=_default, option=options)
+
+    if compact:
+        return json.dumps(
+            data, ensure_ascii=True, default=_default, separators=(',', ':')
+        ).encode('ascii')
+
+    return json.dumps(
+        data, ensure_ascii=False, default=_default, indent=2 if indent else None
+    ).encode('utf-8')
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Deserializa JSON desde bytes, memoryview o str (orjson lee memoryview sin copiar)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    if ujson is not None:
+        return ujson.loads(data)
+    return json.loads(data)
@@ -1,70 +1,301 @@
 """
 Mejorador de imágenes UNIFICADO - Lo mejor de ambos sistemas.
-Usa solo OpenCV y PIL para garantizar compatibilidad.
+Usa solo OpenCV y NumPy para garantizar compatibilidad.
 """
 import cv2
 import numpy as np
-from PIL import Image
-import io
+import atexit
+import hashlib
 import logging
-from typing import Dict, Any, Tuple
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_GRAY
+except ImportError:  # pragma: no cover - depende del entorno
+    TurboJPEG = None
 
 logger = logging.getLogger(__name__)
 
+# Bytes mágicos de JPEG (SOI + inicio de marcador)
+_JPEG_MAGIC = b'\xff\xd8\xff'
+
+
+# Kernels y elementos estructurantes constantes (se construyen una sola vez)
+_SHARPEN_AGGRESSIVE = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]], dtype=np.float32)
+_SHARPEN_GENTLE = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype=np.float32)
+_RECT_1 = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 1))
+_RECT_2 = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
+_RECT_3 = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+_RECT_4 = cv2.getStructuringElement(cv2.MORPH_RECT, (4, 4))
+
+# Lado largo objetivo de la imagen a procesar y tolerancia antes de reescalar
+_TARGET_LONG_EDGE = 1600
+_UPSCALE_BELOW = 0.9
+_DOWNSCALE_ABOVE = 1.25
+
+# Caché en disco de imágenes mejoradas (PNG por hash de contenido y estrategia).
+# Subir la versión al cambiar cualquier paso del pipeline invalida lo cacheado
+_ENHANCE_PIPELINE_VERSION = 1
+_ENHANCED_CACHE_MAX_FILES = 2048
+_ENHANCED_CACHE_TRIM_EVERY = 64
+
+
+@lru_cache(maxsize=256)
+def _gamma_table(gamma: float) -> np.ndarray:
+    """LUT de corrección gamma (compartida y de solo lectura) para un gamma ya redondeado."""
+    table = (np.power(np.arange(256, dtype=np.float64) / 255.0, 1.0 / gamma) * 255).astype(np.uint8)
+    table.setflags(write=False)
+    return table
+
+def _jpeg_exif_orientation(data: bytes) -> int:
+    """Valor de la etiqueta EXIF Orientation de un JPEG (1 si no hay o no se puede leer)."""
+    try:
+        i = 2
+        while i + 4 <= len(data) and data[i] == 0xFF:
+            marker = data[i + 1]
+            if marker in (0xD9, 0xDA):  # Fin de imagen / inicio de datos
+                break
+            seg_len = int.from_bytes(data[i + 2:i + 4], 'big')
+            if marker == 0xE1 and data[i + 4:i + 10] == b'Exif\0\0':
+                tiff = i + 10
+                order = 'little' if data[tiff:tiff + 2] == b'II' else 'big'
+                ifd = tiff + int.from_bytes(data[tiff + 4:tiff + 8], order)
+                for n in range(int.from_bytes(data[ifd:ifd + 2], order)):
+                    entry = ifd + 2 + 12 * n
+                    if int.from_bytes(data[entry:entry + 2], order) == 0x0112:
+                        return int.from_bytes(data[entry + 8:entry + 10], order)
+                return 1
+            i += 2 + seg_len
+    except (IndexError, ValueError):
+        pass
+    return 1
+
+
+def _apply_exif_orientation(image: np.ndarray, orientation: int) -> np.ndarray:
+    """Gira/refleja la imagen según EXIF Orientation (como hace cv2.imdecode)."""
+    if orientation == 2:
+        return cv2.flip(image, 1)
+    if orientation == 3:
+        return cv2.rotate(image, cv2.ROTATE_180)
+    if orientation == 4:
+        return cv2.flip(image, 0)
+    if orientation == 5:
+        return cv2.transpose(image)
+    if orientation == 6:
+        return cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
+    if orientation == 7:
+        return cv2.flip(cv2.transpose(image), -1)
+    if orientation == 8:
+        return cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return image
+
+
+def _init_enhance_worker():
+    """Initializer del pool: OpenCV a un hilo por proceso (evita sobre-suscripción)."""
+    cv2.setNumThreads(1)
+
+
+def _enhance_one(image_data: bytes, strategy: str, heavy_denoise: bool = False) -> np.ndarray:
+    """Mejora una imagen en un proceso worker (usa la instancia global del módulo)."""
+    return image_enhancer.enhance_scanned_document(image_data, strategy, heavy_denoise)
+
+
 class ImageEnhancer:
     """Mejorador unificado de imágenes para OCR."""
     
     def __init__(self):
         self.debug_enabled = True
+        
+        # Objetos CLAHE reutilizados entre imágenes (uno por configuración)
+        self._clahe_aggressive = cv2.createCLAHE(clipLimit=4.0, tileGridSize=(4, 4))
+        self._clahe_document = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        self._clahe_conservative = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self._clahe_balanced = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(6, 6))
+        
+        # T-API: OpenCL se sondea en el primer uso (ver _use_opencl), nunca al
+        # construir: la instancia global también se crea en la precarga del forkserver
+        self._ocl_enabled = None
+        
+        # Decodificador JPEG con SIMD (libjpeg-turbo), si está instalado
+        self._tj = None
+        if TurboJPEG is not None:
+            try:
+                self._tj = TurboJPEG()
+            except Exception as e:
+                logger.warning(f"libturbojpeg no disponible, usando cv2.imdecode: {e}")
+        
+        # Hilos para las binarizaciones independientes (se crean al primer uso;
+        # OpenCV libera el GIL durante cada umbral)
+        self._threshold_pool = None
+        self._threshold_pool_lock = threading.Lock()
+        
+        # Caché de resultados en disco: opcional, solo si se define OCR_ENHANCE_CACHE_DIR
+        cache_dir = os.getenv("OCR_ENHANCE_CACHE_DIR")
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._cache_writes = 0
+        
         logger.info("ImageEnhancer inicializado")
 
-    def enhance_scanned_document(self, image_data: bytes, strategy: str = "auto") -> np.ndarray:
+    def enhance_scanned_document(self, image_data: bytes, strategy: str = "auto",
+                                 heavy_denoise: bool = False) -> np.ndarray:
         """
         Pipeline unificado de mejora de imagen.
         
         Args:
             image_data: Datos binarios de la imagen
             strategy: "auto", "aggressive", "conservative", "document"
+            heavy_denoise: Usar NL-means (muy costoso) en lugar del filtro bilateral;
+                solo para entradas muy ruidosas
         """
+        cache_path = self._cache_path(image_data, strategy, heavy_denoise)
+        cached = self._read_cached(cache_path)
+        if cached is not None:
+            return cached
+        
         try:
             # 1. Cargar y preparar imagen
             image = self._load_and_prepare_image(image_data)
             logger.info(f"Imagen cargada: {image.shape}")
             
-            # 2. Análisis de calidad para estrategia automática
+            # 2. Estrategia automática: para documentos escaneados siempre es la
+            # agresiva; el análisis de calidad solo se calcula como diagnóstico
             if strategy == "auto":
-                quality_metrics = self._analyze_image_quality(image)
-                strategy = self._select_optimal_strategy(quality_metrics)
-                logger.info(f"Estrategia seleccionada: {strategy} (calidad detectada)")
+                if self.debug_enabled and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Calidad detectada: {self._analyze_image_quality(image)}")
+                strategy = "aggressive"
+                logger.info(f"Estrategia seleccionada: {strategy}")
             
             # 3. Aplicar pipeline según estrategia
-            enhanced = self._apply_enhancement_strategy(image, strategy)
+            enhanced = self._apply_enhancement_strategy(image, strategy, heavy_denoise)
             
             logger.info(f"Mejora completada con estrategia: {strategy}")
+            self._write_cached(cache_path, enhanced)
             return enhanced
             
         except Exception as e:
             logger.error(f"Error en mejora de imagen: {e}")
             return self._emergency_fallback(image_data)
     
+    def enhance_batch(self, blobs: List[bytes], strategy: str = "auto",
+                      workers: Optional[int] = None, heavy_denoise: bool = False) -> List[np.ndarray]:
+        """
+        Mejora varias imágenes (p. ej. páginas) en paralelo con un pool de procesos.
+        
+        Cada imagen es independiente; el resultado conserva el orden de entrada.
+        """
+        if len(blobs) <= 1:
+            return [self.enhance_scanned_document(blob, strategy, heavy_denoise) for blob in blobs]
+        
+        mp_context = None
+        if sys.platform.startswith('linux'):
+            # Workers nacidos de un proceso que ya importó OpenCV/NumPy
+            mp_context = multiprocessing.get_context('forkserver')
+            mp_context.set_forkserver_preload(['utils.image_enhancer'])
+        
+        max_workers = min(workers or os.cpu_count() or 1, len(blobs))
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context,
+                                 initializer=_init_enhance_worker) as executor:
+            return list(executor.map(_enhance_one, blobs, [strategy] * len(blobs),
+                                     [heavy_denoise] * len(blobs)))
+    
+    def _cache_path(self, image_data: bytes, strategy: str, heavy_denoise: bool) -> Optional[Path]:
+        """Ruta del resultado cacheado para (versión del pipeline, contenido, estrategia, denoise)."""
+        if self.cache_dir is None:
+            return None
+        key = hashlib.sha256(image_data).hexdigest()[:16]
+        suffix = "_nlm" if heavy_denoise else ""
+        return self.cache_dir / f"v{_ENHANCE_PIPELINE_VERSION}_{key}_{strategy}{suffix}.png"
+    
+    def _read_cached(self, cache_path: Optional[Path]) -> Optional[np.ndarray]:
+        """Lee una imagen mejorada de la caché (y la marca como usada)."""
+        if cache_path is None or not cache_path.exists():
+            return None
+        image = cv2.imread(str(cache_path), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            return None
+        try:
+            os.utime(cache_path)  # el recorte por antigüedad queda como LRU
+        except OSError:
+            pass
+        logger.debug(f"Imagen mejorada desde caché: {cache_path.name}")
+        return image
+    
+    def _write_cached(self, cache_path: Optional[Path], image: np.ndarray):
+        """Guarda el resultado (PNG de compresión rápida, escritura atómica)."""
+        if cache_path is None:
+            return
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Temporal con extensión .png: imwrite elige el formato por la extensión
+            tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp.png")
+            if cv2.imwrite(str(tmp_path), image, [cv2.IMWRITE_PNG_COMPRESSION, 1]):
+                os.replace(tmp_path, cache_path)
+            
+            self._cache_writes += 1
+            if self._cache_writes % _ENHANCED_CACHE_TRIM_EVERY == 0:
+                self._trim_cache()
+        except Exception as e:
+            logger.warning(f"No se pudo cachear imagen mejorada: {e}")
+    
+    def _trim_cache(self):
+        """Recorta la caché a las entradas usadas más recientemente (por mtime)."""
+        with os.scandir(self.cache_dir) as it:
+            entries = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith('.png')]
+        if len(entries) <= _ENHANCED_CACHE_MAX_FILES:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - _ENHANCED_CACHE_MAX_FILES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
     def _load_and_prepare_image(self, image_data: bytes) -> np.ndarray:
         """Cargar y preparar imagen de forma robusta."""
-        nparr = np.frombuffer(image_data, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = None
+        if self._tj is not None and image_data[:3] == _JPEG_MAGIC:
+            # JPEG directo a escala de grises: las estrategias trabajan en grises
+            # y así se omite el cvtColor posterior
+            try:
+                image = self._tj.decode(image_data, pixel_format=TJPF_GRAY)
+                if image.ndim == 3:
+                    image = image[:, :, 0]
+                # TurboJPEG no aplica la orientación EXIF (cv2.imdecode sí)
+                image = _apply_exif_orientation(image, _jpeg_exif_orientation(image_data))
+            except Exception as e:
+                logger.debug(f"TurboJPEG no pudo decodificar, usando cv2.imdecode: {e}")
+                image = None
+        
+        if image is None:
+            nparr = np.frombuffer(image_data, np.uint8)
+            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         
         if image is None:
             raise ValueError("No se pudo decodificar la imagen")
         
-        # Redimensionar si es necesario (usando el mejor método de ambos)
+        # Llevar el lado largo al objetivo una sola vez (solo si se aleja de la tolerancia)
         height, width = image.shape[:2]
-        if width < 2000:
-            # Factor de escala inteligente
-            scale_factor = max(2.0, 2000 / width)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            
-            image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-            logger.info(f"Imagen redimensionada: {width}x{height} → {new_width}x{new_height}")
+        long_edge = max(height, width)
+        if long_edge < _TARGET_LONG_EDGE * _UPSCALE_BELOW:
+            interpolation = cv2.INTER_CUBIC
+        elif long_edge > _TARGET_LONG_EDGE * _DOWNSCALE_ABOVE:
+            interpolation = cv2.INTER_AREA  # más nítido al reducir
+        else:
+            return image
+        
+        scale_factor = _TARGET_LONG_EDGE / long_edge
+        new_width = max(1, round(width * scale_factor))
+        new_height = max(1, round(height * scale_factor))
+        
+        image = cv2.resize(image, (new_width, new_height), interpolation=interpolation)
+        logger.info(f"Imagen redimensionada: {width}x{height} → {new_width}x{new_height}")
         
         return image
     
@@ -76,17 +307,16 @@ class ImageEnhancer:
         else:
             gray = image.copy()
         
-        # Métricas básicas
-        contrast = np.std(gray)
-        brightness = np.mean(gray)
+        # Histograma: única pasada sobre los píxeles para las métricas de intensidad
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+        hist_peaks = self._analyze_histogram_peaks(hist)
+        
+        # Métricas básicas (media y desviación derivadas de los 256 bins)
+        brightness, contrast = self._histogram_mean_std(hist)
         
         # Detección de ruido (Laplaciano)
         laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
         
-        # Análisis de histograma
-        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-        hist_peaks = self._analyze_histogram_peaks(hist)
-        
         # Detección de texto vs imagen
         edges = cv2.Canny(gray, 50, 150)
         edge_density = np.sum(edges > 0) / edges.size
@@ -104,96 +334,80 @@ class ImageEnhancer:
             'likely_text': edge_density > 0.1 and contrast > 20
         }
     
-    def _select_optimal_strategy(self, quality: Dict[str, float]) -> str:
-        """Seleccionar estrategia óptima - SIEMPRE agresiva para documentos escaneados."""
-        # CAMBIO CRÍTICO: Para documentos escaneados, siempre usar estrategia agresiva
-        logger.info(f"Calidad detectada: {quality}")
-        
-        # Para cualquier documento con problemas, usar agresivo
-        if (quality['is_dark'] or quality['is_light'] or 
-            quality['is_low_contrast'] or quality['is_noisy'] or
-            quality['contrast'] < 50):
-            strategy = "aggressive"
-        else:
-            # Incluso para documentos "buenos", usar agresivo si hay dudas
-            strategy = "aggressive"
-        
-        logger.info(f"Estrategia seleccionada: {strategy}")
-        return strategy
-
-    def _apply_enhancement_strategy(self, image: np.ndarray, strategy: str) -> np.ndarray:
+    def _apply_enhancement_strategy(self, image: np.ndarray, strategy: str,
+                                    heavy_denoise: bool = False) -> np.ndarray:
         """Aplicar estrategia de mejora específica."""
-        # Convertir a escala de grises
-        if len(image.shape) == 3:
+        # Única conversión a escala de grises: las estrategias reciben `gray`
+        # (no modifican la entrada, así que no hace falta copiarla)
+        if image.ndim == 3:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         else:
-            gray = image.copy()
+            gray = image
         
         if strategy == "aggressive":
-            return self._apply_aggressive_enhancement(gray)
+            return self._apply_aggressive_enhancement(gray, heavy_denoise)
         elif strategy == "document":
             return self._document_enhancement(gray)
         elif strategy == "conservative":
             return self._conservative_enhancement(gray)
         else:
-            return self._balanced_enhancement(gray)
+            return self._balanced_enhancement(gray, heavy_denoise)
     
-    def _apply_aggressive_enhancement(self, image: np.ndarray) -> np.ndarray:
-        """Mejora agresiva optimizada para documentos muy problemáticos."""
+    def _apply_aggressive_enhancement(self, gray: np.ndarray, heavy_denoise: bool = False) -> np.ndarray:
+        """Mejora agresiva optimizada para documentos muy problemáticos (entrada en grises)."""
         try:
             logger.info("Aplicando mejora agresiva optimizada")
             
-            # 1. Conversión a escala de grises si es necesario
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image.copy()
-            
-            # 2. Redimensionar si la imagen es muy grande (optimización)
-            height, width = gray.shape
-            if height > 2000 or width > 2000:
-                scale = min(2000/height, 2000/width)
-                new_height, new_width = int(height * scale), int(width * scale)
-                gray = cv2.resize(gray, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-                logger.info(f"Imagen redimensionada de {width}x{height} a {new_width}x{new_height}")
+            # 1-2. La imagen ya llega en escala de grises y a resolución de trabajo
+            # (_apply_enhancement_strategy y _load_and_prepare_image).
+            # Con OpenCL se sube una vez al dispositivo y se descarga al final;
+            # todas las operaciones siguientes aceptan ndarray o UMat
+            use_ocl = self._use_opencl()
+            src = cv2.UMat(gray) if use_ocl else gray
             
-            # 3. Eliminación de ruido MUY agresiva
-            denoised = cv2.fastNlMeansDenoising(gray, None, 15, 7, 21)  # Parámetros más fuertes
+            # 3. Eliminación de ruido: bilateral (preserva bordes); NL-means solo bajo demanda
+            if heavy_denoise:
+                denoised = cv2.fastNlMeansDenoising(src, None, 15, 7, 21)  # Parámetros más fuertes
+            else:
+                denoised = cv2.bilateralFilter(src, 9, 75, 75)
             
             # 4. CLAHE muy agresivo
-            clahe = cv2.createCLAHE(clipLimit=4.0, tileGridSize=(4,4))  # Más agresivo
-            enhanced = clahe.apply(denoised)
+            enhanced = self._clahe_aggressive.apply(denoised)  # clipLimit 4.0, tiles 4x4
             
             # 5. Corrección gamma adaptativa
             gamma = self._calculate_optimal_gamma(enhanced)
             gamma_corrected = self._apply_gamma_correction(enhanced, gamma)
             
-            # 6. Sharpening muy fuerte
-            kernel = np.array([[-1,-1,-1],
-                              [-1, 12,-1],
-                              [-1,-1,-1]])  # Kernel más agresivo
-            sharpened = cv2.filter2D(gamma_corrected, -1, kernel)
-            
-            # 7. Binarización múltiple con votación
-            # Otsu
-            _, binary1 = cv2.threshold(sharpened, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            # 6. Sharpening muy fuerte: kernel [[-1,-1,-1],[-1,12,-1],[-1,-1,-1]]
+            # expresado como 13·img - suma 3x3 (box separable, exacto en int16)
+            box_sum = cv2.boxFilter(gamma_corrected, cv2.CV_16S, (3, 3), normalize=False)
+            sharpened = cv2.addWeighted(gamma_corrected, 13.0, box_sum, -1.0, 0, dtype=cv2.CV_8U)
             
-            # Adaptativa
-            binary2 = cv2.adaptiveThreshold(sharpened, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                          cv2.THRESH_BINARY, 15, 8)
+            # 7. Binarización múltiple con votación (los tres umbrales en paralelo)
+            binary1, binary2, binary3 = self._get_threshold_pool().map(lambda f: f(sharpened), (
+                # Otsu
+                lambda img: cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1],
+                # Adaptativa
+                lambda img: cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                                  cv2.THRESH_BINARY, 15, 8),
+                # Media simple
+                lambda img: cv2.threshold(img, cv2.mean(img)[0], 255, cv2.THRESH_BINARY)[1],
+            ))
             
-            # Media simple
-            mean_val = np.mean(sharpened)
-            _, binary3 = cv2.threshold(sharpened, mean_val, 255, cv2.THRESH_BINARY)
+            # Votación: cada pixel se decide por mayoría (2 de 3). Las tres entradas
+            # valen 0/255, así que la mayoría bit a bit sobre uint8 es exacta
+            final_binary = cv2.bitwise_or(
+                cv2.bitwise_and(binary1, binary2),
+                cv2.bitwise_and(binary3, cv2.bitwise_or(binary1, binary2))
+            )
             
-            # Votación: cada pixel se decide por mayoría
-            vote = (binary1.astype(np.float32) + binary2.astype(np.float32) + binary3.astype(np.float32)) / 3
-            final_binary = (vote > 127).astype(np.uint8) * 255
-            
-            # 8. Limpieza morfológica final
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2,2))
-            cleaned = cv2.morphologyEx(final_binary, cv2.MORPH_CLOSE, kernel)
-            cleaned = cv2.morphologyEx(cleaned, cv2.MORPH_OPEN, kernel)
+            # 8. Limpieza morfológica final. Se mantiene cierre + apertura 2x2: un
+            # único cierre 3x3 une trazos a menos de 3 px y no elimina el ruido sal
+            # que quitaba la apertura (no es equivalente sin validar paridad OCR)
+            cleaned = cv2.morphologyEx(final_binary, cv2.MORPH_CLOSE, _RECT_2)
+            cleaned = cv2.morphologyEx(cleaned, cv2.MORPH_OPEN, _RECT_2)
+            if use_ocl:
+                cleaned = cleaned.get()
             
             logger.info("Mejora agresiva completada exitosamente")
             return cleaned
@@ -201,25 +415,42 @@ class ImageEnhancer:
         except Exception as e:
             logger.error(f"Error en mejora agresiva: {e}")
             # Fallback: al menos binarización básica
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image
             _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
             return binary
 
+    def _use_opencl(self) -> bool:
+        """Con OpenCL disponible, las operaciones sobre cv2.UMat corren en GPU/iGPU."""
+        if self._ocl_enabled is None:
+            cv2.ocl.setUseOpenCL(cv2.ocl.haveOpenCL())
+            self._ocl_enabled = cv2.ocl.useOpenCL()
+        return self._ocl_enabled
+    
+    def _get_threshold_pool(self) -> ThreadPoolExecutor:
+        """Pool de hilos para las binarizaciones, creado bajo demanda (nunca antes de un fork)."""
+        with self._threshold_pool_lock:
+            if self._threshold_pool is None:
+                self._threshold_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="enhance-threshold")
+            return self._threshold_pool
+    
+    def close(self):
+        """Cierra el pool de binarizaciones (se vuelve a crear si se usa de nuevo)."""
+        with self._threshold_pool_lock:
+            pool, self._threshold_pool = self._threshold_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+    
     def _calculate_optimal_gamma(self, image: np.ndarray) -> float:
-        """Calcular gamma óptimo para la imagen."""
+        """Calcular gamma óptimo para la imagen (ndarray o cv2.UMat)."""
         # Calcular histograma
         hist = cv2.calcHist([image], [0], None, [256], [0, 256])
         
         # Encontrar percentiles
-        total_pixels = image.shape[0] * image.shape[1]
-        cumsum = np.cumsum(hist)
+        cumsum = np.cumsum(hist.ravel())
+        total_pixels = cumsum[-1]
         
-        # Percentiles 25 y 75
-        p25_idx = np.where(cumsum >= total_pixels * 0.25)[0][0]
-        p75_idx = np.where(cumsum >= total_pixels * 0.75)[0][0]
+        # Percentiles 25 y 75: primer bin cuya acumulada alcanza el umbral (búsqueda binaria)
+        p25_idx = int(np.searchsorted(cumsum, total_pixels * 0.25))
+        p75_idx = int(np.searchsorted(cumsum, total_pixels * 0.75))
         
         # Calcular gamma basado en la distribución
         if p25_idx < 85:  # Imagen muy oscura
@@ -228,7 +459,7 @@ class ImageEnhancer:
             gamma = 1.3
         else:
             # Gamma adaptativo
-            gamma = 1.0 + (128 - np.mean(image)) / 256
+            gamma = 1.0 + (128 - cv2.mean(image)[0]) / 256
         
         # Limitar gamma a rango razonable
         gamma = max(0.5, min(2.0, gamma))
@@ -246,8 +477,7 @@ class ImageEnhancer:
         denoised = cv2.bilateralFilter(gamma_corrected, 9, 75, 75)
         
         # 3. CLAHE moderado
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-        contrast_enhanced = clahe.apply(denoised)
+        contrast_enhanced = self._clahe_document.apply(denoised)
         
         # 4. Corrección de inclinación precisa
         angle_corrected = self._correct_skew_robust(contrast_enhanced)
@@ -271,8 +501,7 @@ class ImageEnhancer:
         logger.info("Aplicando mejora conservadora...")
         
         # 1. CLAHE suave
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(gray)
+        enhanced = self._clahe_conservative.apply(gray)
         
         # 2. Corrección de inclinación
         angle_corrected = self._correct_skew_robust(enhanced)
@@ -281,21 +510,22 @@ class ImageEnhancer:
         _, binary = cv2.threshold(angle_corrected, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
         # 4. Limpieza mínima
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
-        final = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
+        final = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, _RECT_2)
         
         return final
     
-    def _balanced_enhancement(self, gray: np.ndarray) -> np.ndarray:
+    def _balanced_enhancement(self, gray: np.ndarray, heavy_denoise: bool = False) -> np.ndarray:
         """Pipeline balanceado (por defecto)."""
         logger.info("Aplicando mejora balanceada...")
         
         # Combinación de los mejores aspectos
         gamma_corrected = self._apply_gamma_correction(gray, 0.7)
-        denoised = cv2.fastNlMeansDenoising(gamma_corrected, None, 20, 7, 21)
+        if heavy_denoise:
+            denoised = cv2.fastNlMeansDenoising(gamma_corrected, None, 20, 7, 21)
+        else:
+            denoised = cv2.bilateralFilter(gamma_corrected, 9, 75, 75)
         
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(6,6))
-        contrast_enhanced = clahe.apply(denoised)
+        contrast_enhanced = self._clahe_balanced.apply(denoised)
         
         angle_corrected = self._correct_skew_robust(contrast_enhanced)
         sharpened = self._apply_gentle_sharpening(angle_corrected)
@@ -308,9 +538,8 @@ class ImageEnhancer:
     
     def _apply_gamma_correction(self, image: np.ndarray, gamma: float) -> np.ndarray:
         """Aplicar corrección gamma."""
-        inv_gamma = 1.0 / gamma
-        table = np.array([((i / 255.0) ** inv_gamma) * 255 for i in np.arange(0, 256)]).astype("uint8")
-        corrected = cv2.LUT(image, table)
+        # Gamma cuantizado a centésimas: las tablas se reutilizan entre imágenes
+        corrected = cv2.LUT(image, _gamma_table(round(float(gamma), 2)))
         logger.debug(f"Gamma {gamma:.2f} aplicado")
         return corrected
     
@@ -357,8 +586,7 @@ class ImageEnhancer:
     def _apply_aggressive_sharpening(self, image: np.ndarray) -> np.ndarray:
         """Sharpening agresivo."""
         # Kernel agresivo
-        kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
-        sharpened = cv2.filter2D(image, -1, kernel)
+        sharpened = cv2.filter2D(image, -1, _SHARPEN_AGGRESSIVE)
         
         # Unsharp mask adicional
         gaussian = cv2.GaussianBlur(image, (5, 5), 0)
@@ -370,8 +598,7 @@ class ImageEnhancer:
     
     def _apply_gentle_sharpening(self, image: np.ndarray) -> np.ndarray:
         """Sharpening suave."""
-        kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
-        return cv2.filter2D(image, -1, kernel)
+        return cv2.filter2D(image, -1, _SHARPEN_GENTLE)
     
     def _multi_method_binarization_extended(self, image: np.ndarray) -> np.ndarray:
         """Binarización con 5 métodos (versión extendida)."""
@@ -430,52 +657,51 @@ class ImageEnhancer:
     def _morphological_cleanup_aggressive(self, binary: np.ndarray) -> np.ndarray:
         """Limpieza morfológica agresiva."""
         # Eliminar ruido
-        kernel_noise = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-        opened = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel_noise)
+        opened = cv2.morphologyEx(binary, cv2.MORPH_OPEN, _RECT_3)
         
         # Cerrar gaps
-        kernel_close = cv2.getStructuringElement(cv2.MORPH_RECT, (4, 4))
-        closed = cv2.morphologyEx(opened, cv2.MORPH_CLOSE, kernel_close)
+        closed = cv2.morphologyEx(opened, cv2.MORPH_CLOSE, _RECT_4)
         
         # Engrosar caracteres
-        kernel_dilate = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
-        dilated = cv2.dilate(closed, kernel_dilate, iterations=1)
+        dilated = cv2.dilate(closed, _RECT_2, iterations=1)
         
         return dilated
     
     def _morphological_cleanup_gentle(self, binary: np.ndarray) -> np.ndarray:
         """Limpieza morfológica suave."""
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
-        closed = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
-        
-        kernel_open = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 1))
-        opened = cv2.morphologyEx(closed, cv2.MORPH_OPEN, kernel_open)
+        closed = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, _RECT_2)
+        opened = cv2.morphologyEx(closed, cv2.MORPH_OPEN, _RECT_1)
         
         return opened
     
     def _find_optimal_threshold(self, histogram: np.ndarray) -> int:
         """Encontrar umbral óptimo."""
-        hist_smooth = cv2.GaussianBlur(histogram.astype(np.float32), (5, 1), 0)
-        
-        min_val = float('inf')
-        min_idx = 128
+        # Media móvil de 5 bins a lo largo del histograma (256 valores)
+        hist_smooth = np.convolve(histogram.ravel().astype(np.float32), np.ones(5, dtype=np.float32) / 5, mode='same')
         
-        for i in range(50, 200):
-            if hist_smooth[i][0] < min_val:
-                min_val = hist_smooth[i][0]
-                min_idx = i
-        
-        return min_idx
+        # Primer mínimo en el rango de grises medios
+        return int(50 + np.argmin(hist_smooth[50:200]))
+    
+    @staticmethod
+    def _histogram_mean_std(histogram: np.ndarray) -> Tuple[float, float]:
+        """Media y desviación estándar (poblacional) de la imagen a partir de su histograma."""
+        counts = histogram.ravel().astype(np.float64)
+        levels = np.arange(counts.size, dtype=np.float64)
+        total = counts.sum()
+        if total == 0:
+            return 0.0, 0.0
+        mean = float(counts @ levels) / total
+        variance = float(counts @ np.square(levels - mean)) / total
+        return mean, variance ** 0.5
     
     def _analyze_histogram_peaks(self, histogram: np.ndarray) -> Dict[str, Any]:
         """Analizar picos del histograma."""
-        hist_flat = histogram.flatten()
-        peaks = []
+        h = histogram.ravel()
+        center = h[1:-1]
         
-        for i in range(1, len(hist_flat) - 1):
-            if hist_flat[i] > hist_flat[i-1] and hist_flat[i] > hist_flat[i+1]:
-                if hist_flat[i] > np.max(hist_flat) * 0.1:  # Solo picos significativos
-                    peaks.append(i)
+        # Máximos locales estrictos que superan el 10% del máximo (picos significativos)
+        is_peak = (center > h[:-2]) & (center > h[2:]) & (center > h.max() * 0.1)
+        peaks = (np.flatnonzero(is_peak) + 1).tolist()
         
         return {
             'num_peaks': len(peaks),
@@ -494,8 +720,7 @@ class ImageEnhancer:
                 return np.ones((100, 100), dtype=np.uint8) * 255
             
             # Solo CLAHE + Otsu
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            enhanced = clahe.apply(image)
+            enhanced = self._clahe_conservative.apply(image)
             _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
             
             logger.warning("Usando fallback de emergencia")
@@ -507,6 +732,7 @@ class ImageEnhancer:
 
 # Instancia global
 image_enhancer = ImageEnhancer()
+atexit.register(image_enhancer.close)
 # Auto-generated comment - 20:13:37
 
 # Auto-generated comment - 20:13:37
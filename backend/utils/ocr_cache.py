@@ -0,0 +1,84 @@
+"""
+Caché de resultados OCR direccionado por contenido de la imagen.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - depende del entorno
+    xxhash = None
+
+try:
+    import diskcache
+except ImportError:  # pragma: no cover - depende del entorno
+    diskcache = None
+
+logger = logging.getLogger(__name__)
+
+
+class OCRCache:
+    """
+    Guarda resultados OCR por (hash de la imagen, idioma, configuración).
+
+    Usa diskcache si está instalado (persistente y compartido entre procesos);
+    si no, un LRU en memoria acotado a `max_entries`.
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+
+        if diskcache is not None:
+            try:
+                self._disk = diskcache.Cache(str(cache_dir))
+            except Exception as e:
+                logger.warning(f"Caché OCR en disco no disponible, usando memoria: {e}")
+
+    @staticmethod
+    def image_key(image: np.ndarray) -> str:
+        """Hash del contenido de la imagen (incluye forma y tipo)."""
+        data = np.ascontiguousarray(image)
+        header = f"{data.shape}{data.dtype}".encode()
+        if xxhash is not None:
+            hasher = xxhash.xxh3_64(header)
+        else:
+            hasher = hashlib.blake2b(header, digest_size=8)
+        hasher.update(memoryview(data).cast('B'))
+        return hasher.hexdigest()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Any]:
+        """Devuelve el resultado cacheado o None."""
+        if self._disk is not None:
+            return self._disk.get(key)
+
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple[str, str, str], value: Any):
+        """Guarda el resultado OCR (texto o palabras) de una imagen."""
+        if self._disk is not None:
+            self._disk.set(key, value)
+            return
+
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def close(self):
+        """Cierra el almacenamiento en disco."""
+        if self._disk is not None:
+            self._disk.close()
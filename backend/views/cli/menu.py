@@ -11,6 +11,17 @@ sys.path.insert(0, str(root_dir))
 
 from controllers.ocr_controller import OCRController
 
+# Secuencia ANSI: borrar pantalla y llevar el cursor al inicio
+_CLEAR = "\x1b[2J\x1b[H"
+
+if os.name == 'nt':
+    # Consolas antiguas de Windows no interpretan ANSI sin colorama (opcional)
+    try:
+        import colorama
+        colorama.just_fix_windows_console()
+    except (ImportError, AttributeError):
+        pass
+
 
 class OCRMenu:
     """Interfaz CLI simplificada."""
@@ -41,6 +52,7 @@ class OCRMenu:
                     
             except KeyboardInterrupt:
                 print("\n\nSaliendo...")
+                self.controller.flush()
                 self.running = False
             except Exception as e:
                 print(f"\nError: {e}")
@@ -93,8 +105,8 @@ class OCRMenu:
                     print(f"  Método: {method}")  # ← Mostrar método usado
                     print(f"  Páginas: {result.get('paginas', 0)}")
                     print(f"  Tablas detectadas: {len(result.get('tablas', []))}")
-                    if result.get("results_saved"):
-                        print("✓ Resultados guardados (TXT, JSON, MD)")
+                    if result.get("save_queued"):
+                        print(f"✓ Guardando resultados en {result.get('output_folder')} (TXT, JSON, MD)")
                 else:
                     print(f"✗ Error: {result.get('error', 'Unknown')}")
         except ValueError:
@@ -120,11 +132,13 @@ class OCRMenu:
                 print(f"  {i}. {proc}")
     
     def _handle_exit(self):
+        self.controller.shutdown()
         print("\n¡Adiós!")
         self.running = False
     
     def _clear_screen(self):
-        os.system('clear' if os.name == 'posix' else 'cls')
+        sys.stdout.write(_CLEAR)
+        sys.stdout.flush()
 
 
 def main():
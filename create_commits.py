@@ -4,48 +4,234 @@ Script para crear commits consolidados distribuidos en el 2 y 3 de agosto de 202
 Reduce de 86 commits a 47 commits totales (23 del 2 de agosto, 24 del 3 de agosto).
 """
 
+import asyncio
+import os
+import shutil
 import subprocess
+import sys
 import datetime
+from itertools import chain, cycle
 from pathlib import Path
 
-def run_git_command(cmd):
-    """Ejecuta un comando git y retorna el resultado."""
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+try:
+    import pygit2
+except ImportError:  # Opcional: sin pygit2 se usa git fast-import
+    pygit2 = None
+
+# Ruta absoluta de git resuelta una sola vez (evita buscar en PATH en cada llamada)
+GIT = shutil.which("git") or "git"
+
+# Líneas de estado pendientes (se escriben en bloques, no una por commit)
+_log = []
+_LOG_FLUSH_EVERY = 10
+
+def log(line):
+    """Acumula una línea de estado; se vuelcan juntas cada _LOG_FLUSH_EVERY líneas."""
+    _log.append(f"{line}\n")
+    if len(_log) >= _LOG_FLUSH_EVERY:
+        flush_log()
+
+def flush_log():
+    """Escribe de una vez las líneas de estado acumuladas."""
+    sys.stdout.write("".join(_log))
+    sys.stdout.flush()
+    _log.clear()
+
+def run_git_command(argv, stdin_text=None):
+    """Ejecuta un comando git (lista de argumentos, sin shell) y retorna el resultado."""
+    # La salida estándar no se usa: solo se captura stderr para informar errores
+    result = subprocess.run(argv, input=stdin_text, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True, check=False)
     if result.returncode != 0:
-        print(f"Error: {result.stderr}")
+        log(f"Error: {result.stderr}")
     return result.returncode == 0
 
-def create_commit(message, date_str, files=None):
+def git_output(argv):
+    """Ejecuta un comando git y retorna su salida (None si falla)."""
+    result = subprocess.run(argv, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        log(f"Error: {result.stderr}")
+        return None
+    return result.stdout.strip()
+
+async def run_git_command_async(argv, stdin_text=None):
+    """Versión asíncrona de run_git_command (el bucle queda libre mientras git trabaja)."""
+    proc = await asyncio.create_subprocess_exec(
+        *argv,
+        stdin=subprocess.PIPE if stdin_text is not None else subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate(stdin_text.encode() if stdin_text is not None else None)
+    if proc.returncode != 0:
+        log(f"Error: {stderr.decode()}")
+    return proc.returncode == 0
+
+async def create_commit(message, date_str, files=None):
     """Crea un commit con mensaje y fecha específicos."""
     if files:
-        for file in files:
-            run_git_command(f"git add {file}")
+        # Un solo `git add` para todos los archivos; rutas por stdin separadas por NUL
+        # (sin límite de ARG_MAX ni problemas con espacios)
+        await run_git_command_async([GIT, "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                                    stdin_text="\0".join(str(f) for f in files))
     else:
-        run_git_command("git add -A")
+        await run_git_command_async([GIT, "add", "-A"])
     
-    cmd = f'git commit -m "{message}" --date="{date_str}"'
-    return run_git_command(cmd)
+    return await run_git_command_async([GIT, "commit", "-m", message, f"--date={date_str}"])
 
-def make_small_change(file_path, change_type="comment"):
-    """Hace un pequeño cambio en un archivo."""
+async def commit_one_by_one(entries):
+    """
+    Crea los commits uno a uno con git asíncrono.
+    
+    El cambio del archivo del siguiente commit se escribe mientras git crea
+    el actual (salvo que sea el mismo archivo, que debe esperar a su `git add`).
+    """
+    async def change(entry):
+        _, date, file_path = entry
+        return await asyncio.to_thread(make_small_change, file_path, tag=date.split()[1])
+    
+    async def commit(entry, changed):
+        message, date, file_path = entry
+        if not changed:
+            log(f"✗ Error modificando archivo para: {message}")
+        elif await create_commit(message, date, [file_path]):
+            log(f"✓ Commit creado: {message}")
+        else:
+            log(f"✗ Error creando commit: {message}")
+    
+    if not entries:
+        return
+    
+    changed = await change(entries[0])
+    for entry, next_entry in zip(entries, entries[1:] + [None]):
+        if next_entry is None:
+            await commit(entry, changed)
+        elif next_entry[2] == entry[2]:
+            await commit(entry, changed)
+            changed = await change(next_entry)
+        else:
+            _, changed = await asyncio.gather(commit(entry, changed), change(next_entry))
+
+# Contenido actual de cada archivo modificado (camino fast-import; se lee una sola vez)
+_cache = {}
+
+def small_change(change_type="comment", tag=None):
+    """
+    Retorna los bytes que el pequeño cambio agrega al final del archivo.
+    
+    tag: marca del comentario (p. ej. la hora HH:MM:SS del propio commit);
+    si no se indica se usa la hora actual.
+    """
+    if change_type == "comment":
+        # Agregar un comentario al final
+        if tag is None:
+            tag = datetime.datetime.now().strftime('%H:%M:%S')
+        return f"\n# Auto-generated comment - {tag}\n".encode()
+    if change_type == "whitespace":
+        # Agregar una línea en blanco
+        return b"\n"
+    return b""
+
+def next_content(file_path, change_type="comment", tag=None):
+    """Aplica el cambio sobre el contenido en memoria del archivo y lo retorna."""
+    if file_path not in _cache:
+        _cache[file_path] = Path(file_path).read_bytes()
+    _cache[file_path] += small_change(change_type, tag)
+    return _cache[file_path]
+
+def make_small_change(file_path, change_type="comment", tag=None):
+    """Hace un pequeño cambio en un archivo (solo escribe lo agregado)."""
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        if change_type == "comment":
-            # Agregar un comentario al final
-            content += f"\n# Auto-generated comment - {datetime.datetime.now().strftime('%H:%M:%S')}\n"
-        elif change_type == "whitespace":
-            # Agregar una línea en blanco
-            content += "\n"
-        
-        with open(file_path, 'w') as f:
-            f.write(content)
+        fd = os.open(file_path, os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, small_change(change_type, tag))
+        finally:
+            os.close(fd)
         return True
     except Exception as e:
-        print(f"Error modificando {file_path}: {e}")
+        log(f"Error modificando {file_path}: {e}")
         return False
 
+def parse_commit_date(date_str):
+    """Interpreta 'YYYY-MM-DD HH:MM:SS' en hora local (como `git commit --date`)."""
+    return datetime.datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S").astimezone()
+
+def git_raw_date(date_str):
+    """Convierte la fecha del commit a formato raw de git: '<unix> <zona>'."""
+    date = parse_commit_date(date_str)
+    return f"{int(date.timestamp())} {date.strftime('%z')}"
+
+def pygit2_commits(entries):
+    """
+    Crea los commits dentro del proceso con libgit2 (pygit2), sin lanzar git.
+    
+    Cada cambio se escribe en disco y se agrega al índice, así que el árbol
+    de trabajo queda sincronizado sin pasos extra.
+    """
+    repo = pygit2.Repository(".")
+    committer = repo.default_signature
+    
+    for message, date, file_path in entries:
+        if not make_small_change(file_path, tag=date.split()[1]):
+            log(f"✗ Error modificando archivo para: {message}")
+            continue
+        try:
+            repo.index.add(file_path)
+            repo.index.write()
+            tree = repo.index.write_tree()
+            
+            # Fecha de autor fijada (como --date); committer con la hora actual
+            when = parse_commit_date(date)
+            offset = int(when.utcoffset().total_seconds() // 60)
+            author = pygit2.Signature(committer.name, committer.email, int(when.timestamp()), offset)
+            repo.create_commit("HEAD", author, committer, message + "\n", tree, [repo.head.target])
+            log(f"✓ Commit creado: {message}")
+        except pygit2.GitError as e:
+            log(f"✗ Error creando commit: {message} ({e})")
+
+def fast_import_commits(entries):
+    """
+    Crea todos los commits con un único proceso `git fast-import`.
+    
+    entries: lista de (mensaje, fecha, archivo). Los cambios se aplican en
+    memoria y se envían por stdin; la rama solo se actualiza si fast-import
+    termina bien, así que ante un error no queda nada a medias.
+    """
+    ref = git_output([GIT, "symbolic-ref", "HEAD"])
+    parent = git_output([GIT, "rev-parse", "HEAD"])
+    name = git_output([GIT, "config", "user.name"])
+    email = git_output([GIT, "config", "user.email"])
+    if not all((ref, parent, name, email)):
+        return False
+    
+    # El contenido se toma de la caché en memoria: el disco no se toca hasta el final
+    stream = []
+    for message, date, file_path in entries:
+        blob = next_content(file_path, tag=date.split()[1])
+        
+        # Igual que `git commit --date`: fecha de autor fijada, de committer la actual
+        now = datetime.datetime.now().astimezone()
+        data = (message + "\n").encode()
+        stream.append(f"commit {ref}\n".encode())
+        stream.append(f"author {name} <{email}> {git_raw_date(date)}\n".encode())
+        stream.append(f"committer {name} <{email}> {int(now.timestamp())} {now.strftime('%z')}\n".encode())
+        stream.append(b"data %d\n%s" % (len(data), data))
+        if parent:
+            stream.append(f"from {parent}\n".encode())
+            parent = None
+        stream.append(f"M 100644 inline {file_path}\n".encode())
+        stream.append(b"data %d\n%s\n" % (len(blob), blob))
+    
+    proc = subprocess.Popen([GIT, "fast-import", "--quiet", "--date-format=raw"], stdin=subprocess.PIPE)
+    proc.communicate(b"".join(stream))
+    if proc.returncode != 0:
+        # Los cambios en memoria no llegaron a ningún commit: descartarlos
+        _cache.clear()
+        return False
+    
+    # Sincronizar índice y árbol de trabajo con los archivos modificados
+    return run_git_command([GIT, "checkout", "HEAD", "--", *_cache])
+
 # Commits para el 2 de agosto (necesito 21 más para llegar a 23)
 commits_aug_2 = [
     ("refactor(models): improve PDF processor structure", "2025-08-02 09:00:00"),
@@ -115,29 +301,21 @@ files_to_modify = [
     "requirements.txt"
 ]
 
-# Crear commits del 2 de agosto
-for i, (message, date) in enumerate(commits_aug_2):
-    file_to_modify = files_to_modify[i % len(files_to_modify)]
-    
-    if make_small_change(file_to_modify):
-        if create_commit(message, date, [file_to_modify]):
-            print(f"✓ Commit creado: {message}")
-        else:
-            print(f"✗ Error creando commit: {message}")
-    else:
-        print(f"✗ Error modificando archivo para: {message}")
+# (mensaje, fecha, archivo) de cada commit: los archivos se reparten en rotación
+entries = [
+    (message, date, file_to_modify)
+    for (message, date), file_to_modify in zip(chain(commits_aug_2, commits_aug_3), cycle(files_to_modify))
+]
 
-# Crear commits del 3 de agosto
-for i, (message, date) in enumerate(commits_aug_3):
-    file_to_modify = files_to_modify[i % len(files_to_modify)]
-    
-    if make_small_change(file_to_modify):
-        if create_commit(message, date, [file_to_modify]):
-            print(f"✓ Commit creado: {message}")
-        else:
-            print(f"✗ Error creando commit: {message}")
-    else:
-        print(f"✗ Error modificando archivo para: {message}")
+if pygit2 is not None:
+    pygit2_commits(entries)
+elif fast_import_commits(entries):
+    for message, _, _ in entries:
+        log(f"✓ Commit creado: {message}")
+else:
+    log("git fast-import falló, creando commits uno a uno...")
+    asyncio.run(commit_one_by_one(entries))
+flush_log()
 
 print("\n¡Commits consolidados creados exitosamente!")
 print("Resumen:")
@@ -1,21 +1,33 @@
 """
 Punto de entrada principal para la interfaz CLI.
 """
+import importlib
+import os
 import sys
-from pathlib import Path
+
+def _import_simple_menu():
+    """Importa el menú simplificado; toca sys.path solo si la importación directa falla."""
+    try:
+        simple_menu = importlib.import_module("views.cli.simple_menu")
+    except ModuleNotFoundError as e:
+        # Solo si falta el propio paquete views; otros errores se propagan
+        if e.name != 'views' and not (e.name or '').startswith('views.'):
+            raise
+        # Agregar el directorio raíz al path para importaciones y reintentar
+        root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+        sys.path.insert(0, root_dir)
+        simple_menu = importlib.import_module("views.cli.simple_menu")
+    return simple_menu.main
 
 def main():
     """Función principal del CLI."""
-    # Agregar el directorio raíz al path para importaciones
-    root_dir = Path(__file__).parent.parent.parent
-    sys.path.insert(0, str(root_dir))
-    
+    # El banner sale antes de importar el menú (arrastra OCR/PDF/OpenCV)
     print("Iniciando Sistema OCR - Docker Version")
-    print("=" * 40)
+    print("=" * 40, flush=True)
     
     try:
-        # Usar menú simplificado para empezar
-        from views.cli.simple_menu import main as simple_main
+        # Usar menú simplificado para empezar (importado justo a tiempo)
+        simple_main = _import_simple_menu()
         simple_main()
         
     except ImportError as e: